@@ -0,0 +1,55 @@
+"""
+Call an ASGI app in process, without sockets or an HTTP library.
+"""
+
+import json
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+async def asgi_request(app, method: str, path: str, body=None, headers: Optional[dict] = None,
+                       client_ip: str = "127.0.0.1"):
+    """Send one request straight to `app` and return (status, headers, body bytes)"""
+    url = urlsplit(path)
+    payload = b"" if body is None else json.dumps(body).encode()
+    raw_headers = [(b"host", b"testserver"), (b"content-length", str(len(payload)).encode())]
+    if body is not None:
+        raw_headers.append((b"content-type", b"application/json"))
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), value.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": (client_ip, 50000),
+        "server": ("testserver", 80),
+    }
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    response = {"status": None, "headers": {}, "body": bytearray()}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], bytes(response["body"])
@@ -0,0 +1,79 @@
+"""
+Concurrency benchmark: throughput of catalog reads under many clients.
+
+Starts `uvicorn main:app` on a scratch copy of the database (or uses
+--url for a server that is already running) and hammers it with N
+concurrent keep-alive clients for a fixed duration.
+
+To compare against the old threadpool-bound handlers, run the script
+once on each revision:
+
+    python -m benchmarks.bench_concurrency --clients 250 --duration 15
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from benchmarks.client import HttpClient
+from benchmarks.server import serve
+
+PATHS = ["/categories", "/articles?limit=20", "/articles/featured", "/articles/on-sale", "/articles/1"]
+
+
+async def worker(url: str, deadline: float, latencies: list, errors: list):
+    client = HttpClient(url)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                status, _, _ = await client.request("GET", path)
+            except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                errors.append(path)
+                await client.close()
+                continue
+            if status >= 500:
+                errors.append(path)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await client.close()
+
+
+async def run(url: str, clients: int, duration: float):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(url, deadline, latencies, errors) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"👥 clients:     {clients}")
+    print(f"📨 requests:    {len(latencies):,} ({len(errors)} errors)")
+    print(f"⚡ throughput:  {len(latencies) / elapsed:,.0f} req/s")
+    if latencies:
+        print(f"⏱  latency:     p50 {pick(0.50):.1f}ms  p95 {pick(0.95):.1f}ms  "
+              f"p99 {pick(0.99):.1f}ms  mean {statistics.fmean(latencies) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=250)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--url", default=None, help="benchmark an already running server")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(run(args.url, args.clients, args.duration))
+        return
+
+    with serve(args.port) as url:
+        asyncio.run(run(url, args.clients, args.duration))
+
+
+if __name__ == "__main__":
+    main()
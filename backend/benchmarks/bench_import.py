@@ -0,0 +1,79 @@
+"""
+Bulk import benchmark: rows per second for a synthetic supplier feed.
+
+Writes a JSONL feed of --articles records, imports it into a scratch
+database (every SKU new), imports it again (every SKU unchanged, so
+skipped), then imports it with new prices (every SKU updated).
+
+    python -m benchmarks.bench_import --articles 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = [["XS", "S", "M", "L", "XL"], ["38", "39", "40", "41", "42"], ["One Size"]]
+COLORS = ["Black", "White", "Navy", "Gray", "Red", "Olive", "Tan"]
+
+
+def write_feed(path: str, n_articles: int):
+    from benchmarks.bench_search import ADJECTIVES, NOUNS, BRANDS
+
+    rng = random.Random(42)
+    with open(path, "w", encoding="utf-8") as feed:
+        for i in range(n_articles):
+            adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+            feed.write(json.dumps({
+                "sku": f"SKU-{i:08d}",
+                "name": f"{adjective} {noun}",
+                "description": f"{adjective.lower()} {noun.lower()} made with care",
+                "price": round(rng.uniform(5, 300), 2),
+                "brand": rng.choice(BRANDS),
+                "category": rng.choice(["Clothes", "Shoes", "Accessories"]),
+                "sizes": rng.choice(SIZES),
+                "colors": rng.sample(COLORS, 3),
+                "stock_quantity": rng.randint(0, 100),
+                "discount_percentage": rng.choice([0, 0, 0, 10, 20]),
+            }) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sys.path.insert(0, BACKEND_DIR)
+        os.chdir(tmp)
+        feed = os.path.join(tmp, "feed.jsonl")
+
+        start = time.perf_counter()
+        write_feed(feed, args.articles)
+        print(f"📝 Wrote {args.articles:,} records ({os.path.getsize(feed) / 1e6:.0f} MB) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        from database import engine
+        from migrations import migrate
+        from import_catalog import CatalogImporter, read_records
+        migrate(engine)
+
+        for label, price_change in (("insert", 0), ("unchanged", 0), ("update", 1)):
+            importer = CatalogImporter(engine, args.chunk_size, log=lambda message: None)
+            records = (
+                dict(record, price=record["price"] + price_change) for record in read_records(feed)
+            )
+            stats = importer.import_records(records)
+            print(f"📦 {label}: {stats['imported']:,} imported, {stats['unchanged']:,} unchanged "
+                  f"in {stats['seconds']:.1f}s ({stats['rows_per_second']:,.0f} rows/s)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
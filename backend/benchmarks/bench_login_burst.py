@@ -0,0 +1,116 @@
+"""
+Login burst benchmark: catalog latency while /auth/login is hammered.
+
+Measures catalog read latency twice, first on its own and then while an
+open-loop generator fires --rate logins per second. With bcrypt in its
+own process pool, the two latency profiles should stay close, and
+logins over capacity are shed with 503 instead of piling up.
+
+    python -m benchmarks.bench_login_burst --rate 500 --duration 10
+"""
+
+import argparse
+import asyncio
+import time
+from benchmarks.client import HttpClient
+from benchmarks.server import serve
+
+CATALOG_PATHS = ["/categories", "/articles?limit=20", "/articles/featured", "/articles/1"]
+CREDENTIALS = {"username": "burst_user", "password": "burst-password-123"}
+
+
+def percentiles(latencies: list) -> str:
+    if not latencies:
+        return "no samples"
+    latencies = sorted(latencies)
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    return f"p50 {pick(0.50):.1f}ms  p95 {pick(0.95):.1f}ms  p99 {pick(0.99):.1f}ms"
+
+
+async def catalog_clients(url: str, clients: int, deadline: float, statuses: dict = None) -> list:
+    """Latencies of catalog reads until `deadline`, counting replies by status into `statuses` if given"""
+    latencies = []
+
+    async def worker():
+        client = HttpClient(url)
+        i = 0
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status, _, _ = await client.request("GET", CATALOG_PATHS[i % len(CATALOG_PATHS)])
+                latencies.append(time.perf_counter() - start)
+                if statuses is not None:
+                    statuses[status] = statuses.get(status, 0) + 1
+                i += 1
+        finally:
+            await client.close()
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return latencies
+
+
+async def login_burst(url: str, rate: float, deadline: float) -> dict:
+    statuses = {}
+    pending = set()
+    # Cap open sockets; the generator keeps its schedule regardless of replies
+    sockets = asyncio.Semaphore(1000)
+
+    async def login():
+        async with sockets:
+            client = HttpClient(url)
+            try:
+                status, _, _ = await client.request("POST", "/auth/login", CREDENTIALS)
+            except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                status = "error"
+            finally:
+                await client.close()
+        statuses[status] = statuses.get(status, 0) + 1
+
+    interval = 1 / rate
+    next_at = time.perf_counter()
+    while next_at < deadline:
+        task = asyncio.create_task(login())
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        next_at += interval
+        await asyncio.sleep(max(0, next_at - time.perf_counter()))
+    await asyncio.gather(*pending)
+    return statuses
+
+
+async def run(url: str, rate: float, duration: float, clients: int):
+    client = HttpClient(url)
+    await client.request("POST", "/auth/signup", dict(CREDENTIALS, email="burst@example.com"))
+    await client.close()
+
+    quiet = await catalog_clients(url, clients, time.perf_counter() + duration)
+    print(f"🟢 catalog alone:       {percentiles(quiet)}  ({len(quiet) / duration:,.0f} req/s)")
+
+    deadline = time.perf_counter() + duration
+    busy, statuses = await asyncio.gather(
+        catalog_clients(url, clients, deadline),
+        login_burst(url, rate, deadline),
+    )
+    print(f"🔥 catalog under burst: {percentiles(busy)}  ({len(busy) / duration:,.0f} req/s)")
+    print(f"🔐 login replies at {rate:.0f}/s: {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=500)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=20, help="concurrent catalog readers")
+    parser.add_argument("--url", default=None, help="benchmark an already running server")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(run(args.url, args.rate, args.duration, args.clients))
+        return
+
+    with serve(args.port) as url:
+        asyncio.run(run(url, args.rate, args.duration, args.clients))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Mixed load benchmark: catalog reads alongside cart writes.
+
+Runs the server twice on a scratch copy of the database, first with
+SQLite's defaults (SQLITE_TUNING=off: rollback journal, so a writer
+blocks every reader) and then with the production profile (WAL, tuned
+pragmas, a read-only pool for the catalog and one serialized writer),
+under the same mix of reader and writer clients.
+
+    python -m benchmarks.bench_mixed_load --readers 50 --writers 20 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from benchmarks.client import HttpClient
+from benchmarks.server import serve
+
+# Uncached catalog reads, so every one of them reaches the database
+READ_PATHS = ["/articles?limit=20", "/articles?limit=20&skip=20", "/articles/search?q=jean", "/articles/search?q=sport"]
+
+
+def percentiles(latencies: list) -> str:
+    if not latencies:
+        return "no samples"
+    latencies = sorted(latencies)
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    return f"p50 {pick(0.50):.1f}ms  p95 {pick(0.95):.1f}ms  p99 {pick(0.99):.1f}ms"
+
+
+async def reader(url: str, deadline: float, stats: dict):
+    client = HttpClient(url)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status, _, _ = await client.request("GET", READ_PATHS[i % len(READ_PATHS)])
+            except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                status = "error"
+                await client.close()
+            i += 1
+            if status == 200:
+                stats["latencies"].append(time.perf_counter() - start)
+            else:
+                stats["errors"] += 1
+    finally:
+        await client.close()
+
+
+async def writer(url: str, n: int, article_ids: list, deadline: float, stats: dict):
+    client = HttpClient(url)
+    try:
+        credentials = {"username": f"mixed_writer_{n}", "password": "mixed-password-123"}
+        status, _, body = await client.request("POST", "/auth/signup", dict(credentials, email=f"mixed{n}@example.com"))
+        if status != 200:
+            status, _, body = await client.request("POST", "/auth/login", credentials)
+        headers = {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+        i = 0
+        while time.perf_counter() < deadline:
+            if i % 10 == 9:
+                method, path, payload = "DELETE", "/cart", None
+            else:
+                method, path, payload = "POST", "/cart", {"article_id": article_ids[(n + i) % len(article_ids)]}
+            start = time.perf_counter()
+            try:
+                status, _, _ = await client.request(method, path, payload, headers)
+            except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                status = "error"
+                await client.close()
+            i += 1
+            if status == 200:
+                stats["latencies"].append(time.perf_counter() - start)
+            else:
+                stats["errors"] += 1
+    finally:
+        await client.close()
+
+
+async def run(url: str, readers: int, writers: int, duration: float) -> dict:
+    client = HttpClient(url)
+    _, _, body = await client.request("GET", "/articles?limit=50")
+    await client.close()
+    article_ids = [article["id"] for article in json.loads(body)]
+
+    reads = {"latencies": [], "errors": 0}
+    writes = {"latencies": [], "errors": 0}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *(reader(url, deadline, reads) for _ in range(readers)),
+        *(writer(url, n, article_ids, deadline, writes) for n in range(writers)),
+    )
+    return {"reads": reads, "writes": writes}
+
+
+def report(label: str, results: dict, duration: float):
+    print(f"\n{label}")
+    for kind in ("reads", "writes"):
+        stats = results[kind]
+        print(f"  {kind:<7} {len(stats['latencies']) / duration:>8,.0f} req/s  "
+              f"{percentiles(stats['latencies'])}  ({stats['errors']} errors)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=50)
+    parser.add_argument("--writers", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    # Cheap bcrypt: this benchmark is about the database, not logins
+    for label, tuning in (("🐢 SQLite defaults", "off"), ("🚀 production profile", "on")):
+        with serve(args.port, env={"SQLITE_TUNING": tuning, "BCRYPT_ROUNDS": "4"}) as url:
+            results = asyncio.run(run(url, args.readers, args.writers, args.duration))
+        report(label, results, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Search benchmark: FTS5 + BM25 index vs the old ILIKE scan.
+
+Seeds a throwaway SQLite database with N synthetic articles and times
+the same queries through both code paths, including terms common to
+every article.
+
+    python -m benchmarks.bench_search --articles 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models import Base, Article, Category
+from search import create_search_index, search_articles_query, ilike_search_query
+
+ADJECTIVES = ["Classic", "Slim", "Vintage", "Premium", "Casual", "Sport", "Wool", "Leather", "Denim", "Silk"]
+NOUNS = ["Jacket", "Jeans", "Sneakers", "Sweater", "Dress", "Boots", "Scarf", "Backpack", "Watch", "Belt"]
+BRANDS = ["BasicWear", "DenimCo", "WarmKnits", "UrbanEdge", "StepUp", "TimeCraft", "CarryAll"]
+# "made" and "care" are in every description: the worst case for ranking
+QUERIES = ["leather", "jack", "denim jeans", "urbanedge", "wool sweater", "boots", "silk scarf", "made", "care"]
+
+
+def seed(engine, n_articles: int, batch_size: int = 10_000):
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"name": f"Category {i}", "is_active": True} for i in range(1, 6)])
+        now = datetime.utcnow()
+        for start in range(0, n_articles, batch_size):
+            rows = []
+            for _ in range(min(batch_size, n_articles - start)):
+                adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+                rows.append({
+                    "name": f"{adjective} {noun}",
+                    "brand": rng.choice(BRANDS),
+                    "description": f"{adjective.lower()} {noun.lower()} made with care " * rng.randint(2, 8),
+                    "price": round(rng.uniform(5, 300), 2),
+                    "category_id": rng.randint(1, 5),
+                    "is_active": True,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            conn.execute(insert(Article), rows)
+
+
+def time_query(session, stmt, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        session.execute(stmt.limit(50)).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        create_search_index(engine)
+
+        print(f"🌱 Seeding {args.articles:,} articles...")
+        start = time.perf_counter()
+        seed(engine, args.articles)
+        print(f"✅ Seeded in {time.perf_counter() - start:.1f}s\n")
+
+        session = sessionmaker(bind=engine)()
+        print(f"{'query':<16}{'ilike p50':>12}{'fts p50':>12}{'speedup':>10}")
+        for q in QUERIES:
+            ilike = statistics.median(time_query(session, ilike_search_query(q), args.repeat))
+            fts = statistics.median(time_query(session, search_articles_query("sqlite", q), args.repeat))
+            print(f"{q:<16}{ilike:>10.2f}ms{fts:>10.2f}ms{ilike / fts:>9.1f}x")
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Serialization benchmark: CPU time to build one article list page.
+
+Compares the old path (load ORM Article objects, validate each one
+through ArticleResponse with from_attributes, encode the JSON) with the
+column-row fast path (select only the response columns as Core rows and
+encode them with orjson). Timings are process CPU time per page. Also
+shows what `fields=` saves for the fields the home screen grid uses.
+
+    python -m benchmarks.bench_serialization --articles 20000 --page 100
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from benchmarks.bench_search import seed
+from models import Base, Article
+from schemas import ArticleResponse
+from serialization import ARTICLE_COLUMNS, article_columns, dump_rows, parse_article_fields, project_rows
+
+article_list_adapter = TypeAdapter(List[ArticleResponse])
+
+GRID_FIELDS = parse_article_fields("name,price,image_url,discount_percentage,rating")
+
+
+def orm_page(session: Session, offset: int, size: int) -> bytes:
+    """What a response_model list endpoint used to do"""
+    stmt = select(Article).where(Article.is_active == True).order_by(Article.id).offset(offset).limit(size)
+    articles = session.execute(stmt).scalars().all()
+    validated = article_list_adapter.validate_python(articles, from_attributes=True)
+    body = json.dumps(article_list_adapter.dump_python(validated, mode="json")).encode()
+    session.expunge_all()
+    return body
+
+
+def rows_page(session: Session, offset: int, size: int) -> bytes:
+    stmt = select(*ARTICLE_COLUMNS).where(Article.is_active == True).order_by(Article.id).offset(offset).limit(size)
+    return dump_rows([dict(row._mapping) for row in session.execute(stmt)])
+
+
+def grid_page(session: Session, offset: int, size: int) -> bytes:
+    columns = article_columns(GRID_FIELDS)
+    stmt = select(*columns).where(Article.is_active == True).order_by(Article.id).offset(offset).limit(size)
+    return dump_rows(project_rows([dict(row._mapping) for row in session.execute(stmt)], GRID_FIELDS))
+
+
+def measure(build, session: Session, pages: int, size: int) -> list:
+    timings = []
+    for page in range(pages):
+        start = time.process_time()
+        build(session, page * size, size)
+        timings.append((time.process_time() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=20_000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        seed(engine, args.articles)
+
+        with Session(engine) as session:
+            old, new = orm_page(session, 0, args.page), rows_page(session, 0, args.page)
+            if json.loads(old) != json.loads(new):
+                raise SystemExit("❌ the two paths produce different JSON")
+
+            # Warm both paths (schema build, statement cache) before timing
+            measure(orm_page, session, 5, args.page)
+            measure(rows_page, session, 5, args.page)
+            orm = statistics.median(measure(orm_page, session, args.pages, args.page))
+            rows = statistics.median(measure(rows_page, session, args.pages, args.page))
+            grid = statistics.median(measure(grid_page, session, args.pages, args.page))
+            full_size, grid_size = len(new), len(grid_page(session, 0, args.page))
+        engine.dispose()
+
+    print(f"📄 {args.page}-article page, median CPU time over {args.pages} pages")
+    print(f"  ORM + response_model validation: {orm:>7.2f}ms")
+    print(f"  Core rows + orjson:              {rows:>7.2f}ms  ({orm / rows:.1f}x faster)")
+    print(f"  ...with fields={','.join(GRID_FIELDS)}: {grid:>7.2f}ms")
+    print(f"📦 payload: {full_size:,} bytes full, {grid_size:,} bytes with fields= ({full_size / grid_size:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Cache invalidation check: cached rows are dropped when a write commits.
+
+Caches an article and a user, then edits both on a session and checks
+that the entries survive the flush and a rollback, and are gone once
+the edit commits.
+
+    python -m benchmarks.check_cache_invalidation
+"""
+
+from benchmarks.harness import run_check
+
+
+async def run() -> list:
+    from database import AsyncSessionLocal
+    from cache import catalog_cache, user_cache
+    from models import Article, Category, User
+
+    async with AsyncSessionLocal() as db:
+        category = Category(name="Cached")
+        db.add(category)
+        await db.flush()
+        article = Article(name="Parka", price=120.0, category_id=category.id)
+        user = User(username="cached", email="cached@example.com", hashed_password="x")
+        db.add_all([article, user])
+        await db.commit()
+    article_key = ("article", article.id)
+    catalog_cache.set(article_key, "cached")
+    user_cache.set("cached", "cached")
+
+    failures = []
+
+    def expect(label: str, cached: bool):
+        entries = catalog_cache.get(article_key), user_cache.get("cached")
+        ok = entries == (("cached", "cached") if cached else (None, None))
+        print(f"{'✅' if ok else '❌'} {label}")
+        if not ok:
+            failures.append(f"{label}: cached entries {entries}")
+
+    async def edit(db):
+        (await db.get(Article, article.id)).price += 10
+        (await db.get(User, user.id)).username = "renamed"
+        await db.flush()
+
+    async with AsyncSessionLocal() as db:
+        await edit(db)
+        expect("flushed edits keep the cache", cached=True)
+        await db.rollback()
+        expect("rolled back edits keep the cache", cached=True)
+        await edit(db)
+        await db.commit()
+        expect("committed edits drop the cache", cached=False)
+    return failures
+
+
+def main():
+    run_check(run, "Cache invalidation check", "Caches are invalidated when writes commit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Cart batch check: batches that touch the same line key more than once.
+
+Against a scratch database, sends POST /cart/batch requests that remove a
+line and add it back, and that move a line onto another line's size and
+color, then checks that each batch commits (200), that colliding updates
+are reported in the per-op errors, and that the stored cart matches.
+
+    python -m benchmarks.check_cart_batch
+"""
+
+import json
+from benchmarks.harness import auth_headers, run_check
+
+
+async def run() -> list:
+    from sqlalchemy import select
+    from benchmarks.asgi import asgi_request
+    from database import AsyncSessionLocal
+    from main import app
+    from models import User, Category, Article, CartItem
+
+    async with AsyncSessionLocal() as db:
+        category = Category(name="Batch")
+        db.add(category)
+        await db.flush()
+        article = Article(name="Sneaker", price=80.0, category_id=category.id, stock_quantity=100)
+        user = User(username="shopper", email="shopper@example.com", hashed_password="x")
+        db.add_all([article, user])
+        await db.flush()
+        db.add_all([
+            CartItem(user_id=user.id, article_id=article.id, quantity=1, size="42", color="red"),
+            CartItem(user_id=user.id, article_id=article.id, quantity=2, size="43", color="red"),
+        ])
+        await db.commit()
+        article_id, user_id = article.id, user.id
+
+    headers = auth_headers("shopper")
+
+    async def batch(*operations) -> tuple:
+        status, _, body = await asgi_request(app, "POST", "/cart/batch", {"operations": list(operations)}, headers)
+        return status, json.loads(body)
+
+    async def lines() -> dict:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(CartItem).where(CartItem.user_id == user_id))
+            return {(item.size, item.color): item for item in result.scalars()}
+
+    failures = []
+
+    def expect(label: str, condition: bool, detail):
+        print(f"{'✅' if condition else '❌'} {label}")
+        if not condition:
+            failures.append(f"{label}: {detail}")
+
+    before = await lines()
+    red_42, red_43 = before[("42", "red")], before[("43", "red")]
+
+    status, body = await batch(
+        {"op": "remove", "cart_item_id": red_42.id},
+        {"op": "add", "article_id": article_id, "quantity": 3, "size": "42", "color": "red"},
+    )
+    after = await lines()
+    expect("remove then re-add the same line", status == 200 and after[("42", "red")].quantity == 3, (status, body))
+
+    red_42 = after[("42", "red")]
+    status, body = await batch(
+        {"op": "update", "cart_item_id": red_43.id, "size": "42"},
+        {"op": "update", "cart_item_id": red_42.id, "quantity": 5},
+    )
+    after = await lines()
+    expect(
+        "update onto another line's size is a per-op error",
+        status == 200 and [error["index"] for error in body.get("errors", [])] == [0]
+        and after[("42", "red")].quantity == 5 and after[("43", "red")].quantity == 2,
+        (status, body),
+    )
+
+    status, body = await batch(
+        {"op": "update", "cart_item_id": red_43.id, "size": "44"},
+        {"op": "add", "article_id": article_id, "quantity": 1, "size": "43", "color": "red"},
+    )
+    after = await lines()
+    expect(
+        "move a line, then add its old size",
+        status == 200 and not body.get("errors")
+        and after[("44", "red")].quantity == 2 and after[("43", "red")].quantity == 1,
+        (status, body),
+    )
+    return failures
+
+
+def main():
+    run_check(run, "Cart batch check", "Cart batches apply per operation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Oversell check: hundreds of simultaneous checkouts of one low-stock article.
+
+Seeds an article with --stock units and --buyers users who each have
+one unit in their cart, fires every POST /orders at once in process,
+then verifies the books: stock never drops below zero, and the units
+sold equal both the stock decrement and the number of successful orders.
+
+    python -m benchmarks.check_checkout_race --buyers 300 --stock 10
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from benchmarks.harness import auth_headers, run_check
+
+
+async def run(buyers: int, stock: int) -> list:
+    from sqlalchemy import func, insert, select
+    from benchmarks.asgi import asgi_request
+    from database import AsyncSessionLocal
+    from main import app
+    from models import User, Category, Article, CartItem, order_items
+
+    async with AsyncSessionLocal() as db:
+        category = Category(name="Race")
+        db.add(category)
+        await db.flush()
+        article = Article(name="Last pair", price=99.0, category_id=category.id, stock_quantity=stock)
+        db.add(article)
+        await db.flush()
+        await db.execute(insert(User), [
+            {"username": f"buyer{i}", "email": f"buyer{i}@example.com", "hashed_password": "x"}
+            for i in range(buyers)
+        ])
+        user_ids = (await db.execute(select(User.id).order_by(User.id))).scalars().all()
+        await db.execute(insert(CartItem), [
+            {"user_id": user_id, "article_id": article.id, "quantity": 1} for user_id in user_ids
+        ])
+        await db.commit()
+        article_id = article.id
+
+    async def checkout(i: int) -> int:
+        status, _, _ = await asgi_request(app, "POST", "/orders", {"payment_method": "card"}, auth_headers(f"buyer{i}"))
+        return status
+
+    statuses = Counter(await asyncio.gather(*(checkout(i) for i in range(buyers))))
+
+    async with AsyncSessionLocal() as db:
+        remaining = await db.scalar(select(Article.stock_quantity).where(Article.id == article_id))
+        sold = await db.scalar(
+            select(func.coalesce(func.sum(order_items.c.quantity), 0)).where(order_items.c.article_id == article_id)
+        )
+
+    print(f"🛒 {buyers} checkouts for {stock} units: {dict(statuses)}")
+    print(f"📦 stock left {remaining}, units sold {sold}")
+
+    failures = []
+    if remaining < 0:
+        failures.append(f"stock went negative: {remaining}")
+    if sold != stock - remaining:
+        failures.append(f"units sold ({sold}) != stock decrement ({stock - remaining})")
+    if sold != statuses.get(200, 0):
+        failures.append(f"units sold ({sold}) != successful orders ({statuses.get(200, 0)})")
+    if sold > stock:
+        failures.append(f"oversold: {sold} units sold with {stock} in stock")
+    unexpected = set(statuses) - {200, 409, 503}
+    if unexpected:
+        failures.append(f"unexpected statuses: {sorted(unexpected)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buyers", type=int, default=300)
+    parser.add_argument("--stock", type=int, default=10)
+    args = parser.parse_args()
+    run_check(run, "Checkout race check", "No oversell", args.buyers, args.stock)
+
+
+if __name__ == "__main__":
+    main()
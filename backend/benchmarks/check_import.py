@@ -0,0 +1,58 @@
+"""
+Import check: re-importing an unchanged feed writes nothing.
+
+Imports a small feed into a scratch database, imports it again and
+checks that every row is reported unchanged and the catalog version did
+not move, then changes one price and checks that only that row is
+imported.
+
+    python -m benchmarks.check_import
+"""
+
+from benchmarks.harness import run_check
+
+FEED = [
+    {"sku": f"SKU-{i}", "name": f"Runner {i}", "price": 50.0 + i, "category": "Shoes",
+     "sizes": ["41", "42"], "colors": ["Black"], "description": None if i % 2 else "light"}
+    for i in range(5)
+]
+
+
+async def run() -> list:
+    from sqlalchemy import select
+    from database import engine
+    from import_catalog import CatalogImporter
+    from models import CatalogVersion
+
+    def catalog_version() -> int:
+        with engine.connect() as conn:
+            return conn.execute(select(CatalogVersion.version).where(CatalogVersion.id == 1)).scalar()
+
+    failures = []
+
+    def expect(label: str, stats: dict, imported: int, unchanged: int, version_moved: bool, before: int):
+        moved = catalog_version() != before
+        ok = (stats["imported"], stats["unchanged"], moved) == (imported, unchanged, version_moved)
+        print(f"{'✅' if ok else '❌'} {label}")
+        if not ok:
+            failures.append(f"{label}: {stats}, catalog version moved: {moved}")
+
+    importer = CatalogImporter(engine, chunk_size=2, log=lambda message: None)
+    before = catalog_version()
+    expect("first import inserts every row", importer.import_records(FEED), len(FEED), 0, True, before)
+
+    before = catalog_version()
+    expect("same feed again is unchanged", importer.import_records(FEED), 0, len(FEED), False, before)
+
+    before = catalog_version()
+    feed = [dict(record, price=record["price"] + 1) if i == 3 else record for i, record in enumerate(FEED)]
+    expect("one new price updates one row", importer.import_records(feed), 1, len(FEED) - 1, True, before)
+    return failures
+
+
+def main():
+    run_check(run, "Import check", "Re-imports only write the rows that changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Login burst check: a burst of logins never fails a request or stalls the catalog.
+
+Runs the API under uvicorn, fires --rate logins per second for --duration
+seconds while catalog clients read, and fails on any 5xx reply, login or
+catalog, or if catalog p95 under the burst exceeds --max-p95-ms. The
+password queue is made deep enough to hold the whole burst, so no reply
+is a deliberate 503: any 5xx means a request starved, e.g. for a pooled
+database connection held across a bcrypt wait.
+
+    python -m benchmarks.check_login_burst --rate 50 --duration 2
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from benchmarks.bench_login_burst import CREDENTIALS, catalog_clients, login_burst, percentiles
+from benchmarks.client import HttpClient
+from benchmarks.server import serve
+
+
+async def run(url: str, rate: float, duration: float, clients: int, max_p95_ms: float) -> list:
+    client = HttpClient(url)
+    await client.request("POST", "/auth/signup", dict(CREDENTIALS, email="burst@example.com"))
+    await client.close()
+
+    catalog_statuses = {}
+    deadline = time.perf_counter() + duration
+    latencies, login_statuses = await asyncio.gather(
+        catalog_clients(url, clients, deadline, catalog_statuses),
+        login_burst(url, rate, deadline),
+    )
+    print(f"🔥 catalog under burst: {percentiles(latencies)}  {catalog_statuses}")
+    print(f"🔐 login replies at {rate:.0f}/s: {login_statuses}")
+
+    failures = []
+    for label, statuses in (("login", login_statuses), ("catalog", catalog_statuses)):
+        errors = {status: count for status, count in statuses.items() if not isinstance(status, int) or status >= 500}
+        if errors:
+            failures.append(f"{label} replies with server errors: {errors}")
+    p95 = sorted(latencies)[int(0.95 * len(latencies))] * 1000 if latencies else 0.0
+    if p95 > max_p95_ms:
+        failures.append(f"catalog p95 {p95:.0f}ms under the burst (budget {max_p95_ms:.0f}ms)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=50)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--clients", type=int, default=5, help="concurrent catalog readers")
+    parser.add_argument("--max-p95-ms", type=float, default=2000)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    with serve(args.port, env={"PASSWORD_MAX_QUEUE": "100000"}) as url:
+        failures = asyncio.run(run(url, args.rate, args.duration, args.clients, args.max_p95_ms))
+
+    if failures:
+        print("\n❌ Login burst check failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ No request failed or stalled during the login burst")
+
+
+if __name__ == "__main__":
+    main()
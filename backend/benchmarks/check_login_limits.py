@@ -0,0 +1,60 @@
+"""
+Login limit check: failed logins cannot lock a user out of their account.
+
+With rate limiting on, one client sends wrong passwords for an account
+until it is refused (429), then the account owner logs in from another
+address, and the attacker with the right password is refused too. Also
+checks that successful logins are never charged as failed attempts.
+
+    python -m benchmarks.check_login_limits
+"""
+
+import os
+from benchmarks.harness import run_check
+
+ATTACKER_IP, OWNER_IP = "203.0.113.66", "198.51.100.7"
+CREDENTIALS = {"username": "owner", "password": "right-password-123"}
+
+
+async def run() -> list:
+    from benchmarks.asgi import asgi_request
+    from main import app
+    from rate_limit import login_attempts
+
+    async def login(password: str, client_ip: str) -> int:
+        status, _, _ = await asgi_request(
+            app, "POST", "/auth/login", dict(CREDENTIALS, password=password), client_ip=client_ip
+        )
+        return status
+
+    failures = []
+    status, _, body = await asgi_request(app, "POST", "/auth/signup", dict(CREDENTIALS, email="owner@example.com"))
+    if status != 200:
+        return [f"signup returned {status}: {body[:200]!r}"]
+
+    successes = [await login(CREDENTIALS["password"], OWNER_IP) for _ in range(3)]
+    if set(successes) != {200} or login_attempts.limited or len(login_attempts._buckets):
+        failures.append(f"successful logins were charged as failed attempts: {successes}")
+
+    guesses = [await login("wrong", ATTACKER_IP) for _ in range(int(login_attempts.burst) + 1)]
+    print(f"🔐 {len(guesses)} wrong passwords from one client: {guesses}")
+    if guesses[-1] != 429 or set(guesses[:-1]) != {401}:
+        failures.append(f"guessing client was not refused after {int(login_attempts.burst)} failures: {guesses}")
+    if await login(CREDENTIALS["password"], ATTACKER_IP) != 429:
+        failures.append("guessing client was let in once refused")
+    owner = await login(CREDENTIALS["password"], OWNER_IP)
+    print(f"🔑 owner from another address: {owner}")
+    if owner != 200:
+        failures.append(f"owner was locked out of their account: {owner}")
+    return failures
+
+
+def main():
+    os.environ["RATE_LIMITING"] = "on"
+    # The check is about attempt accounting, not bcrypt cost
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    run_check(run, "Login limit check", "Failed logins only ever refuse the failing client")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Metrics check: GET /metrics is a scrape Prometheus accepts.
+
+Checks the exact Content-Type of the exposition (a duplicated charset
+parameter fails strict media type parsers, Prometheus 3 among them) and
+that the body holds the request metrics of a request served before.
+
+    python -m benchmarks.check_metrics
+"""
+
+from benchmarks.harness import run_check
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def run() -> list:
+    from benchmarks.asgi import asgi_request
+    from main import app
+
+    await asgi_request(app, "GET", "/categories")
+    status, headers, body = await asgi_request(app, "GET", "/metrics")
+
+    failures = []
+    if status != 200:
+        failures.append(f"GET /metrics returned {status}")
+    if headers.get("content-type") != CONTENT_TYPE:
+        failures.append(f"Content-Type is {headers.get('content-type')!r}, expected {CONTENT_TYPE!r}")
+    if b"maboutique_" not in body:
+        failures.append(f"no maboutique_ metrics in the exposition: {body[:200]!r}")
+    print(f"📈 {headers.get('content-type')}, {len(body.splitlines())} lines")
+    return failures
+
+
+def main():
+    run_check(run, "Metrics check", "GET /metrics serves a valid exposition")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Migration check: an empty database and the checked-in one both reach head.
+
+Migrates a new database, then a scratch copy of backend/maboutique.db,
+and checks for each that every migration is recorded, that every index
+declared in models.py exists, and that migrating again is a no-op.
+
+    python -m benchmarks.check_migrations
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from benchmarks.harness import BACKEND_DIR
+
+# Each database is migrated in its own process: database.py binds ./maboutique.db at import
+CHECK = """
+from database import engine
+from migrations import check_schema, index_names, migrate
+from models import Base
+
+migrate(engine)
+check_schema(engine)
+declared = {index.name for table in Base.metadata.sorted_tables for index in table.indexes}
+missing = declared - index_names(engine)
+assert not missing, f"indexes missing after migrating: {sorted(missing)}"
+assert migrate(engine) == [], "migrating again applied migrations"
+"""
+
+
+def check(label: str, directory: str) -> bool:
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK], cwd=directory, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=BACKEND_DIR),
+    )
+    if result.returncode != 0:
+        print(f"❌ {label}:\n{result.stderr.strip()}")
+        return False
+    print(f"✅ {label} migrated to head")
+    return True
+
+
+def main():
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        ok &= check("empty database", tmp)
+
+    existing = os.path.join(BACKEND_DIR, "maboutique.db")
+    if os.path.exists(existing):
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(existing, tmp)
+            ok &= check("checked-in maboutique.db", tmp)
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
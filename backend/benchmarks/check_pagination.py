@@ -0,0 +1,92 @@
+"""
+Pagination check: every paginated route serves a second page.
+
+Seeds a scratch database, then for each route fetches a page, follows
+its X-Next-Cursor and checks that the second page is accepted, picks up
+right after the first, and together with it matches one larger page.
+
+    python -m benchmarks.check_pagination
+"""
+
+import json
+from benchmarks.harness import auth_headers, run_check
+
+PAGE = 2
+N_ROWS = 6
+
+ROUTES = [
+    "/categories",
+    "/articles",
+    "/articles?fields=name,price",
+    "/articles/featured",
+    "/articles/featured?fields=name",
+    "/articles/on-sale",
+    "/articles/on-sale?fields=name,discount_percentage",
+    "/articles/search?q=runner",
+    "/articles/search?q=runner&fields=name",
+    "/orders",
+]
+
+
+async def run() -> list:
+    from datetime import datetime, timedelta
+    from benchmarks.asgi import asgi_request
+    from database import AsyncSessionLocal
+    from main import app
+    from models import User, Category, Article, Order
+
+    async with AsyncSessionLocal() as db:
+        categories = [Category(name=f"Category {i}") for i in range(N_ROWS)]
+        user = User(username="pager", email="pager@example.com", hashed_password="x")
+        db.add_all(categories + [user])
+        await db.flush()
+        db.add_all([
+            Article(
+                name=f"Trail runner {i}", description="runner " * (i + 1), price=50.0 + i,
+                category_id=categories[0].id, is_featured=True, discount_percentage=10.0,
+            )
+            for i in range(N_ROWS)
+        ])
+        now = datetime.utcnow()
+        db.add_all([
+            Order(user_id=user.id, total_amount=20.0 + i, created_at=now - timedelta(hours=i))
+            for i in range(N_ROWS)
+        ])
+        await db.commit()
+
+    headers = auth_headers("pager")
+
+    async def get(path: str) -> tuple:
+        status, response_headers, body = await asgi_request(app, "GET", path, headers=headers)
+        return status, response_headers, json.loads(body)
+
+    def with_params(route: str, **params) -> str:
+        query = "&".join(f"{name}={value}" for name, value in params.items())
+        return f"{route}{'&' if '?' in route else '?'}{query}"
+
+    failures = []
+    for route in ROUTES:
+        problem = None
+        status, first_headers, first = await get(with_params(route, limit=PAGE))
+        cursor = first_headers.get("x-next-cursor")
+        if status != 200 or not cursor:
+            problem = f"page 1 returned {status} with cursor {cursor!r}: {first}"
+        else:
+            status, _, second = await get(with_params(route, limit=PAGE, cursor=cursor))
+            _, _, both = await get(with_params(route, limit=2 * PAGE))
+            if status != 200:
+                problem = f"page 2 returned {status}: {second}"
+            elif [row["id"] for row in first + second] != [row["id"] for row in both]:
+                problem = f"pages {first} + {second} != {both}"
+        print(f"{'❌' if problem else '✅'} {route}")
+        if problem:
+            failures.append(f"{route}: {problem}")
+    return failures
+
+
+def main():
+    run_check(run, "Pagination check", "Every paginated route serves its second page")
+
+
+if __name__ == "__main__":
+    main()
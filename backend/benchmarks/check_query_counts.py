@@ -0,0 +1,87 @@
+"""
+SQL statement budget check for the cart and wishlist endpoints.
+
+Drives the app in process on a scratch database and counts the SQL
+statements each endpoint runs, with 1 item and then with 25 items.
+Exits non-zero if an endpoint exceeds its budget, or if its statement
+count grows with the number of items (an N+1 regression).
+
+    python -m benchmarks.check_query_counts
+"""
+
+from benchmarks.harness import auth_headers, run_check
+
+# Statements per request once the user principal is cached
+QUERY_BUDGETS = {
+    "GET /cart": 2,
+    "GET /wishlist": 1,
+    "POST /cart": 3,
+    "POST /wishlist": 2,
+}
+
+N_ITEMS = 25
+
+
+async def run() -> list:
+    from benchmarks.asgi import asgi_request
+    from database import AsyncSessionLocal, async_engine, async_read_engine
+    from main import app
+    from models import User, Category, Article
+    from query_counter import count_queries
+
+    async with AsyncSessionLocal() as db:
+        category = Category(name="Check")
+        db.add(category)
+        db.add(User(username="counter", email="counter@example.com", hashed_password="x"))
+        await db.flush()
+        articles = [Article(name=f"Article {i}", price=10.0 + i, category_id=category.id) for i in range(N_ITEMS)]
+        db.add_all(articles)
+        await db.commit()
+        article_ids = [article.id for article in articles]
+
+    headers = auth_headers("counter")
+    failures = []
+    counts = {}
+
+    async def measure(label: str, method: str, path: str, body=None) -> int:
+        with count_queries(async_engine, async_read_engine) as counter:
+            status, _, content = await asgi_request(app, method, path, body, headers)
+        if status != 200:
+            failures.append(f"{label} returned {status}: {content[:200]!r}")
+        if counter.count > QUERY_BUDGETS[label]:
+            failures.append(
+                f"{label} ran {counter.count} statements (budget {QUERY_BUDGETS[label]}):\n    "
+                + "\n    ".join(counter.statements)
+            )
+        counts.setdefault(label, []).append(counter.count)
+        return counter.count
+
+    # Warm the user principal cache and build the cart totals row, so
+    # only steady-state endpoint queries are counted
+    await asgi_request(app, "GET", "/auth/me", headers=headers)
+    await asgi_request(app, "GET", "/cart", headers=headers)
+
+    await measure("POST /cart", "POST", "/cart", {"article_id": article_ids[0]})
+    await measure("POST /wishlist", "POST", "/wishlist", {"article_id": article_ids[0]})
+    small = {label: await measure(label, "GET", path) for label, path in (("GET /cart", "/cart"), ("GET /wishlist", "/wishlist"))}
+
+    for article_id in article_ids[1:]:
+        await measure("POST /cart", "POST", "/cart", {"article_id": article_id, "size": "M"})
+        await measure("POST /wishlist", "POST", "/wishlist", {"article_id": article_id})
+    large = {label: await measure(label, "GET", path) for label, path in (("GET /cart", "/cart"), ("GET /wishlist", "/wishlist"))}
+
+    for label in small:
+        if large[label] != small[label]:
+            failures.append(f"{label} grows with item count: {small[label]} statements for 1 item, {large[label]} for {N_ITEMS}")
+
+    for label, values in counts.items():
+        print(f"{label:<16} max {max(values)} statements (budget {QUERY_BUDGETS[label]})")
+    return failures
+
+
+def main():
+    run_check(run, "Query budget check", "All endpoints within their query budgets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Query plan regression check for the hot endpoints.
+
+Drives each endpoint in process on a scratch database, captures every
+SQL statement it sends together with its parameters, and runs
+EXPLAIN QUERY PLAN on each one. Exits non-zero if a statement scans a
+whole table instead of going through an index, or sorts its rows in a
+temporary B-tree instead of reading them in index order, unless the
+scan or sort is listed below as the best plan available.
+
+    python -m benchmarks.check_query_plans
+"""
+
+import re
+from benchmarks.harness import auth_headers, run_check
+
+# "SCAN articles" / "SCAN TABLE articles AS a", with no USING INDEX
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+TEMP_SORT = "USE TEMP B-TREE"
+
+# Full scans that are the best plan available, per (endpoint, table)
+ALLOWED_SCANS = {
+    # Nearly every article is active: walking the table in rowid order and
+    # stopping after the page is cheaper than any index on is_active
+    ("GET /articles", "articles"): "unfiltered listing in id order, stops after the page",
+}
+
+# Temp B-tree sorts that no index can avoid, per endpoint
+ALLOWED_SORTS = {
+    # bm25() ranks only the rows the MATCH returned; there is nothing to index
+    "GET /articles/search": "relevance order of the full-text matches",
+}
+
+
+async def run() -> list:
+    from sqlalchemy import insert
+    from benchmarks.asgi import asgi_request
+    from database import AsyncSessionLocal, async_engine, async_read_engine, engine
+    from models import User, Category, Article
+    from main import app
+    from query_counter import count_queries
+
+    async with AsyncSessionLocal() as db:
+        category = Category(name="Plans")
+        db.add(category)
+        db.add(User(username="planner", email="planner@example.com", hashed_password="x"))
+        db.add(User(username="plan_admin", email="plan_admin@example.com", hashed_password="x", is_admin=True))
+        await db.flush()
+        await db.execute(insert(Article), [
+            {
+                "name": f"Plan article {i}",
+                "brand": "Plans",
+                "price": 10.0 + i,
+                "category_id": category.id,
+                "stock_quantity": 100,
+                "is_featured": i % 2 == 0,
+                "discount_percentage": 20.0 if i % 3 == 0 else 0.0,
+            }
+            for i in range(6)
+        ])
+        await db.commit()
+        category_id = category.id
+
+    user_headers = auth_headers("planner")
+    admin_headers = auth_headers("plan_admin")
+    captured = {}
+    failures = []
+
+    async def call(label: str, method: str, path: str, body=None, headers=None) -> dict:
+        with count_queries(async_engine, async_read_engine) as counter:
+            status, response_headers, content = await asgi_request(app, method, path, body, headers)
+        if status >= 400:
+            failures.append(f"{label} returned {status}: {content[:200]!r}")
+        for statement, parameters in zip(counter.statements, counter.parameters):
+            captured.setdefault((label, statement), parameters)
+        return response_headers
+
+    async def call_paged(label: str, path: str, headers=None):
+        """First page by skip/limit, then the next one by cursor"""
+        separator = "&" if "?" in path else "?"
+        first = await call(label, "GET", f"{path}{separator}limit=1", headers=headers)
+        cursor = first.get("x-next-cursor")
+        if cursor:
+            await call(label, "GET", f"{path}{separator}limit=1&cursor={cursor}", headers=headers)
+
+    await call_paged("GET /categories", "/categories")
+    await call("GET /categories/{id}", "GET", f"/categories/{category_id}")
+    await call_paged("GET /articles", "/articles")
+    await call_paged("GET /articles?category_id", f"/articles?category_id={category_id}")
+    await call_paged("GET /articles/featured", "/articles/featured")
+    await call_paged("GET /articles/on-sale", "/articles/on-sale")
+    await call_paged("GET /articles/search", "/articles/search?q=plan")
+    await call("GET /articles/{id}", "GET", "/articles/1")
+
+    await call("POST /cart", "POST", "/cart", {"article_id": 1, "size": "M"}, user_headers)
+    await call("POST /cart", "POST", "/cart", {"article_id": 1, "size": "M"}, user_headers)
+    await call("POST /cart", "POST", "/cart", {"article_id": 2}, user_headers)
+    await call("GET /cart", "GET", "/cart", headers=user_headers)
+    await call("POST /wishlist", "POST", "/wishlist", {"article_id": 1}, user_headers)
+    await call("GET /wishlist", "GET", "/wishlist", headers=user_headers)
+    await call("POST /orders", "POST", "/orders", {"payment_method": "card"}, user_headers)
+    await call("POST /cart", "POST", "/cart", {"article_id": 3}, user_headers)
+    await call("POST /orders", "POST", "/orders", {"payment_method": "card"}, user_headers)
+    await call_paged("GET /orders", "/orders", user_headers)
+    await call_paged("GET /orders?status", "/orders?status=pending", user_headers)
+    await call_paged("GET /orders (admin)", "/orders", admin_headers)
+    await call("GET /orders/{id}", "GET", "/orders/1", headers=user_headers)
+
+    checked = 0
+    with engine.connect() as conn:
+        for (label, statement), parameters in captured.items():
+            if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT INTO CART_TOTALS")):
+                continue
+            if isinstance(parameters, list):
+                parameters = parameters[0] if parameters else ()
+            plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            checked += 1
+            for step in plan:
+                scan = FULL_SCAN.match(step.strip())
+                if scan and (label, scan.group(1)) not in ALLOWED_SCANS:
+                    failures.append(f"{label}: full scan of {scan.group(1)}\n    {statement}\n    plan: {plan}")
+                elif TEMP_SORT in step and label not in ALLOWED_SORTS:
+                    failures.append(f"{label}: sorts in a temp B-tree\n    {statement}\n    plan: {plan}")
+
+    endpoints = sorted({label for label, _ in captured})
+    print(f"🔎 {checked} statements from {len(endpoints)} endpoints explained")
+    return failures
+
+
+def main():
+    run_check(run, "Query plan check", "Every hot query is served by an index")
+
+
+if __name__ == "__main__":
+    main()
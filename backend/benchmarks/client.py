@@ -0,0 +1,79 @@
+"""
+Minimal keep-alive HTTP/1.1 client on asyncio streams.
+
+Benchmarks use it instead of a full HTTP library so that client overhead
+stays small and no extra dependency is needed to run them.
+"""
+
+import asyncio
+import json
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+class HttpClient:
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+
+    async def request(self, method: str, path: str, body=None, headers: Optional[dict] = None):
+        """Send one request and return (status, headers, body bytes)"""
+        if self.writer is None:
+            await self.connect()
+
+        payload = b"" if body is None else json.dumps(body).encode()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(payload)}")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            data = bytearray()
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                data += await self.reader.readexactly(size)
+                await self.reader.readline()
+            content = bytes(data)
+        else:
+            content = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        keep_alive = status_line.startswith(b"HTTP/1.1") or response_headers.get("connection") == "keep-alive"
+        if not keep_alive or response_headers.get("connection") == "close":
+            await self.close()
+        return status, response_headers, content
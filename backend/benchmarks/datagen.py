@@ -0,0 +1,214 @@
+"""
+Deterministic synthetic dataset for load tests.
+
+Seeds users, categories, articles, carts, wishlists and orders through
+the models.py schema. The same scale and --seed always produce the same
+rows, so two benchmark runs only differ by the code under test.
+
+    python -m benchmarks.datagen --scale medium --output /tmp/dataset
+
+writes /tmp/dataset/maboutique.db plus dataset.json, which describes the
+scale and the password every generated user logs in with.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "load-test-password"
+DATASET_FILE = "dataset.json"
+# Fixed clock, so timestamps (and ETags, cursors) are reproducible too
+EPOCH = datetime(2024, 1, 1)
+
+
+@dataclass
+class Scale:
+    users: int
+    categories: int
+    articles: int
+    carts: float  # fraction of users with a non-empty cart
+    cart_items: int
+    wishlist_items: int
+    orders_per_user: int
+
+
+SCALES = {
+    "small": Scale(users=200, categories=8, articles=2_000, carts=0.5, cart_items=3, wishlist_items=3, orders_per_user=2),
+    "medium": Scale(users=5_000, categories=20, articles=50_000, carts=0.5, cart_items=4, wishlist_items=5, orders_per_user=4),
+    "large": Scale(users=50_000, categories=50, articles=500_000, carts=0.4, cart_items=5, wishlist_items=8, orders_per_user=6),
+}
+
+ADJECTIVES = ["Classic", "Slim", "Vintage", "Premium", "Casual", "Sport", "Wool", "Leather", "Denim", "Silk"]
+NOUNS = ["Jacket", "Jeans", "Sneakers", "Sweater", "Dress", "Boots", "Scarf", "Backpack", "Watch", "Belt"]
+BRANDS = ["BasicWear", "DenimCo", "WarmKnits", "UrbanEdge", "StepUp", "TimeCraft", "CarryAll"]
+SIZES = ["XS", "S", "M", "L", "XL"]
+COLORS = ["Black", "White", "Navy", "Gray", "Red", "Olive", "Tan"]
+ORDER_STATUSES = ["pending", "confirmed", "shipped", "delivered", "cancelled"]
+
+BATCH_SIZE = 10_000
+
+
+def _batches(rows, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(engine, scale: Scale, seed: int = 42):
+    """Insert the whole dataset through `engine`, which must hold the empty schema"""
+    from sqlalchemy import insert
+    from auth import get_password_hash
+    from models import User, Category, Article, CartItem, WishlistItem, Order, order_items
+
+    rng = random.Random(seed)
+    # One bcrypt hash shared by every user: hashing per user would dominate
+    hashed_password = get_password_hash(PASSWORD)
+
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [
+            {"name": f"Category {i}", "description": f"Synthetic category {i}", "is_active": True, "created_at": EPOCH}
+            for i in range(1, scale.categories + 1)
+        ])
+
+        for batch in _batches({
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "hashed_password": hashed_password,
+            "full_name": f"Load Test User {i}",
+            "is_active": True,
+            "created_at": EPOCH,
+        } for i in range(scale.users)):
+            conn.execute(insert(User), batch)
+
+        def articles():
+            for i in range(scale.articles):
+                adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+                yield {
+                    "sku": f"GEN-{i:08d}",
+                    "name": f"{adjective} {noun}",
+                    "brand": rng.choice(BRANDS),
+                    "description": f"{adjective.lower()} {noun.lower()} made with care " * rng.randint(1, 4),
+                    "price": round(rng.uniform(5, 300), 2),
+                    "category_id": rng.randint(1, scale.categories),
+                    "sizes": SIZES,
+                    "colors": rng.sample(COLORS, 3),
+                    # Deep stock, so long checkout runs never hit 409
+                    "stock_quantity": 1_000_000,
+                    "is_featured": rng.random() < 0.05,
+                    "is_active": rng.random() < 0.97,
+                    "discount_percentage": rng.choice([0, 0, 0, 0, 10, 20, 30]),
+                    "rating": round(rng.uniform(3.0, 5.0), 1),
+                    "review_count": rng.randint(0, 500),
+                    "created_at": EPOCH,
+                    "updated_at": EPOCH + timedelta(minutes=i),
+                }
+
+        for batch in _batches(articles()):
+            conn.execute(insert(Article), batch)
+
+        def carts():
+            for user_id in range(1, scale.users + 1):
+                if rng.random() < scale.carts:
+                    for article_id in rng.sample(range(1, scale.articles + 1), scale.cart_items):
+                        yield {"user_id": user_id, "article_id": article_id, "quantity": rng.randint(1, 3),
+                               "created_at": EPOCH, "updated_at": EPOCH}
+
+        for batch in _batches(carts()):
+            conn.execute(insert(CartItem), batch)
+
+        def wishlists():
+            for user_id in range(1, scale.users + 1):
+                for article_id in rng.sample(range(1, scale.articles + 1), scale.wishlist_items):
+                    yield {"user_id": user_id, "article_id": article_id, "created_at": EPOCH}
+
+        for batch in _batches(wishlists()):
+            conn.execute(insert(WishlistItem), batch)
+
+        # Orders and their lines, with ids assigned here so lines can refer to them
+        orders, lines = [], []
+        order_id = 0
+        for user_id in range(1, scale.users + 1):
+            for _ in range(scale.orders_per_user):
+                order_id += 1
+                items = [(rng.randint(1, scale.articles), rng.randint(1, 2), round(rng.uniform(5, 300), 2))
+                         for _ in range(rng.randint(1, 4))]
+                created_at = EPOCH - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+                orders.append({
+                    "id": order_id, "user_id": user_id,
+                    "total_amount": round(sum(quantity * price for _, quantity, price in items), 2),
+                    "status": rng.choice(ORDER_STATUSES), "payment_method": "card", "payment_status": "paid",
+                    "created_at": created_at, "updated_at": created_at,
+                })
+                lines.extend({"order_id": order_id, "article_id": article_id, "quantity": quantity,
+                              "price_at_purchase": price} for article_id, quantity, price in items)
+                if len(orders) >= BATCH_SIZE:
+                    conn.execute(insert(Order), orders)
+                    conn.execute(insert(order_items), lines)
+                    orders, lines = [], []
+        if orders:
+            conn.execute(insert(Order), orders)
+            conn.execute(insert(order_items), lines)
+
+
+def build_dataset(output: str, scale: Scale, seed: int = 42) -> dict:
+    """Create `output`/maboutique.db with the dataset and describe it in `output`/dataset.json"""
+    os.makedirs(output, exist_ok=True)
+    if os.path.exists(os.path.join(output, "maboutique.db")):
+        raise SystemExit(f"❌ {output} already holds a database")
+
+    # database.py opens ./maboutique.db: build it from inside the output directory
+    cwd = os.getcwd()
+    os.chdir(output)
+    try:
+        if BACKEND_DIR not in sys.path:
+            sys.path.insert(0, BACKEND_DIR)
+        from database import engine
+        from migrations import migrate
+        migrate(engine)
+        generate(engine, scale, seed)
+        engine.dispose()
+    finally:
+        os.chdir(cwd)
+
+    description = {"scale": asdict(scale), "seed": seed, "password": PASSWORD}
+    with open(os.path.join(output, DATASET_FILE), "w") as f:
+        json.dump(description, f, indent=2)
+    return description
+
+
+def load_description(dataset_dir: str) -> dict:
+    with open(os.path.join(dataset_dir, DATASET_FILE)) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", required=True, help="directory for maboutique.db and dataset.json")
+    args = parser.parse_args()
+
+    # Cheap bcrypt unless the caller asked otherwise: logins are not what is measured
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+    start = time.perf_counter()
+    description = build_dataset(args.output, SCALES[args.scale], args.seed)
+    print(f"🌱 {args.scale} dataset in {args.output} ({time.perf_counter() - start:.1f}s)")
+    for name, value in description["scale"].items():
+        print(f"  {name:<16}{value:>10,}" if isinstance(value, int) else f"  {name:<16}{value:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Shared setup for the check_* scripts.
+
+Each check is a coroutine that drives the app in process and returns a
+list of failure messages. run_check() gives it a scratch database
+migrated to head, in a temporary directory, reports the failures and
+exits non-zero when there are any. tests/test_checks.py runs every check
+under pytest.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from typing import Awaitable, Callable, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def auth_headers(username: str) -> dict:
+    from auth import create_access_token
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': username})}"}
+
+
+def run_check(check: Callable[..., Awaitable[List[str]]], title: str, success: str, *args):
+    """Run `check(*args)` on a new database and report its failures under `title`"""
+    with tempfile.TemporaryDirectory() as tmp:
+        sys.path.insert(0, BACKEND_DIR)
+        # database.py binds ./maboutique.db at import: move first, import after
+        os.chdir(tmp)
+        # Every in-process request comes from 127.0.0.1
+        os.environ.setdefault("RATE_LIMITING", "off")
+        from database import engine
+        from migrations import migrate
+        migrate(engine)
+        failures = asyncio.run(check(*args))
+
+    if failures:
+        print(f"\n❌ {title} failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print(f"\n✅ {success}")
@@ -0,0 +1,344 @@
+"""
+Scenario load runner: latency percentiles and throughput per operation.
+
+Virtual users log in as the generated `user{i}` accounts of a
+benchmarks.datagen dataset and loop through a weighted mix of flows
+(browse, search, login, cart, checkout) for --duration seconds, against
+the app in process (ASGI, no sockets) or a local uvicorn (HTTP).
+
+    python -m benchmarks.datagen --scale small --output /tmp/dataset
+    python -m benchmarks.runner /tmp/dataset --mix mixed --users 50 --save run.json
+    python -m benchmarks.runner /tmp/dataset --mix mixed --users 50 --baseline run.json
+
+With --baseline, exits non-zero when an operation's p95 is more than
+--max-p95-regression percent slower, or its throughput more than
+--max-throughput-drop percent lower, than in the stored run. Both runs
+must use the same dataset, mix and user count to be comparable.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from benchmarks.datagen import ADJECTIVES, NOUNS, load_description
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Relative weight of each flow in a mix
+MIXES = {
+    "browse": {"browse": 1},
+    "search": {"search": 1},
+    "login": {"login": 1},
+    "cart": {"cart": 1},
+    "checkout": {"checkout": 1},
+    # Roughly what the app sees: mostly catalog reads, a few writes
+    "mixed": {"browse": 60, "search": 20, "cart": 12, "checkout": 5, "login": 3},
+}
+
+SHIPPING = {
+    "shipping_address": "1 Benchmark Street",
+    "shipping_city": "Paris",
+    "shipping_postal_code": "75001",
+    "shipping_country": "France",
+    "payment_method": "card",
+}
+
+
+# ============================================
+# TRANSPORTS
+# ============================================
+
+class AsgiTransport:
+    """Same interface as HttpClient, calling the ASGI app directly"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, body=None, headers: Optional[dict] = None):
+        from benchmarks.asgi import asgi_request
+        return await asgi_request(self.app, method, path, body, headers)
+
+    async def close(self):
+        pass
+
+
+# ============================================
+# VIRTUAL USERS
+# ============================================
+
+class Recorder:
+    """Latencies and errors per operation, for requests completed after `start`"""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, operation: str, started: float, ok: bool):
+        if started < self.start:
+            return
+        if ok:
+            self.latencies[operation].append(time.perf_counter() - started)
+        else:
+            self.errors[operation] += 1
+
+
+class VirtualUser:
+    def __init__(self, transport, recorder: Recorder, number: int, dataset: dict, seed: int):
+        self.transport = transport
+        self.recorder = recorder
+        self.rng = random.Random(seed * 100_003 + number)
+        self.scale = dataset["scale"]
+        self.credentials = {"username": f"user{number % self.scale['users']}", "password": dataset["password"]}
+        self.headers: Dict[str, str] = {}
+
+    async def call(self, operation: str, method: str, path: str, body=None, expected=(200,)):
+        """One timed request; returns the decoded JSON body, or None on failure"""
+        started = time.perf_counter()
+        try:
+            status, _, content = await self.transport.request(method, path, body, self.headers)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            await self.transport.close()
+            status, content = None, b""
+        ok = status in expected
+        self.recorder.record(operation, started, ok)
+        return json.loads(content) if ok and content else None
+
+    async def login(self):
+        token = await self.call("POST /auth/login", "POST", "/auth/login", self.credentials)
+        if token is not None:
+            self.headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    async def category_page(self) -> list:
+        category_id = self.rng.randint(1, self.scale["categories"])
+        return await self.call(
+            "GET /articles?category_id", "GET", f"/articles?category_id={category_id}&limit=20"
+        ) or []
+
+    # Flows
+
+    async def browse(self):
+        await self.call("GET /categories", "GET", "/categories")
+        await self.call("GET /articles/featured", "GET", "/articles/featured?limit=20")
+        articles = await self.category_page()
+        if articles:
+            article_id = self.rng.choice(articles)["id"]
+            await self.call("GET /articles/{id}", "GET", f"/articles/{article_id}")
+
+    async def search(self):
+        query = self.rng.choice([self.rng.choice(NOUNS), self.rng.choice(ADJECTIVES)]).lower()
+        await self.call("GET /articles/search", "GET", f"/articles/search?q={query}&limit=20")
+
+    async def add_to_cart(self) -> bool:
+        articles = await self.category_page()
+        if not articles:
+            return False
+        item = {"article_id": self.rng.choice(articles)["id"], "quantity": 1, "size": self.rng.choice(["S", "M", "L"])}
+        return await self.call("POST /cart", "POST", "/cart", item) is not None
+
+    async def cart(self):
+        await self.add_to_cart()
+        await self.call("GET /cart", "GET", "/cart")
+        await self.call("GET /wishlist", "GET", "/wishlist")
+
+    async def checkout(self):
+        if await self.add_to_cart():
+            await self.call("POST /orders", "POST", "/orders", SHIPPING)
+            await self.call("GET /orders", "GET", "/orders")
+
+    async def run(self, mix: Dict[str, int], deadline: float):
+        flows, weights = zip(*mix.items())
+        try:
+            await self.login()
+            while time.perf_counter() < deadline:
+                flow = self.rng.choices(flows, weights)[0]
+                if flow == "login":
+                    await self.login()
+                else:
+                    await getattr(self, flow)()
+        finally:
+            await self.transport.close()
+
+
+# ============================================
+# RUNNING AND REPORTING
+# ============================================
+
+def percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] * 1000
+
+
+def summarize(latencies: list, errors: int, duration: float) -> dict:
+    latencies = sorted(latencies)
+    summary = {"requests": len(latencies), "errors": errors, "throughput": len(latencies) / duration}
+    for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        summary[f"{name}_ms"] = percentile(latencies, q) if latencies else None
+    return summary
+
+
+async def run_load(make_transport, dataset: dict, mix: str, users: int, duration: float, warmup: float, seed: int) -> dict:
+    start = time.perf_counter()
+    recorder = Recorder(start + warmup)
+    deadline = start + warmup + duration
+    await asyncio.gather(*(
+        VirtualUser(make_transport(), recorder, number, dataset, seed).run(MIXES[mix], deadline)
+        for number in range(users)
+    ))
+    # Flows in flight at the deadline finish late: measure over the real window
+    measured = time.perf_counter() - recorder.start
+
+    operations = {
+        operation: summarize(recorder.latencies[operation], recorder.errors[operation], measured)
+        for operation in sorted(set(recorder.latencies) | set(recorder.errors))
+    }
+    all_latencies = [latency for values in recorder.latencies.values() for latency in values]
+    return {
+        "config": {
+            "mix": mix, "users": users, "duration": duration, "warmup": warmup, "seed": seed,
+            "dataset": dataset["scale"], "dataset_seed": dataset["seed"],
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "operations": operations,
+        "total": summarize(all_latencies, sum(recorder.errors.values()), measured),
+    }
+
+
+async def run_in_process(dataset_dir: str, **options) -> dict:
+    """Import main.app against a scratch copy of the dataset and drive it through ASGI"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("maboutique.db", "maboutique.db-wal"):
+            if os.path.exists(os.path.join(dataset_dir, name)):
+                shutil.copy(os.path.join(dataset_dir, name), tmp)
+        # database.py opens ./maboutique.db when main is imported
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        sys.path.insert(0, BACKEND_DIR)
+        from main import app
+        from database import async_engine, async_read_engine, engine
+        from migrations import migrate
+        from passwords import password_hasher
+        migrate(engine)
+
+        # No lifespan events without a server: start what startup() would
+        password_hasher.start()
+        try:
+            return await run_load(lambda: AsgiTransport(app), **options)
+        finally:
+            password_hasher.shutdown()
+            await async_engine.dispose()
+            await async_read_engine.dispose()
+            os.chdir(cwd)
+
+
+def run_over_http(dataset_dir: str, port: int, **options) -> dict:
+    from benchmarks.client import HttpClient
+    from benchmarks.server import serve
+
+    env = {name: os.environ[name] for name in ("BCRYPT_ROUNDS", "RATE_LIMITING")}
+    with serve(port, env, database_dir=dataset_dir) as url:
+        return asyncio.run(run_load(lambda: HttpClient(url), **options))
+
+
+def report(results: dict):
+    config = results["config"]
+    print(f"📊 {config['mix']} mix, {config['users']} users, {config['duration']:.0f}s "
+          f"(after {config['warmup']:.0f}s warmup)")
+    print(f"  {'operation':<26}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    rows = list(results["operations"].items()) + [("total", results["total"])]
+    for operation, summary in rows:
+        if summary["p50_ms"] is None:
+            print(f"  {operation:<26}{summary['throughput']:>9.1f}{'-':>9}{'-':>9}{'-':>9}{summary['errors']:>8}")
+            continue
+        print(f"  {operation:<26}{summary['throughput']:>9.1f}{summary['p50_ms']:>7.1f}ms"
+              f"{summary['p95_ms']:>7.1f}ms{summary['p99_ms']:>7.1f}ms{summary['errors']:>8}")
+
+
+def compare(results: dict, baseline: dict, max_p95_regression: float, max_throughput_drop: float) -> list:
+    """Regressions of `results` against `baseline`, as messages"""
+    regressions = []
+    for key in ("mix", "users", "dataset"):
+        if results["config"][key] != baseline["config"][key]:
+            regressions.append(f"config {key} differs from the baseline: "
+                               f"{results['config'][key]} vs {baseline['config'][key]}")
+    if regressions:
+        return regressions
+
+    rows = dict(baseline["operations"], total=baseline["total"])
+    current = dict(results["operations"], total=results["total"])
+    for operation, before in rows.items():
+        after = current.get(operation)
+        if after is None or not after["requests"]:
+            regressions.append(f"{operation}: no successful requests in this run")
+            continue
+        if before["p95_ms"] and after["p95_ms"] > before["p95_ms"] * (1 + max_p95_regression / 100):
+            regressions.append(f"{operation}: p95 {after['p95_ms']:.1f}ms vs {before['p95_ms']:.1f}ms "
+                               f"(+{(after['p95_ms'] / before['p95_ms'] - 1) * 100:.0f}%)")
+        if after["throughput"] < before["throughput"] * (1 - max_throughput_drop / 100):
+            regressions.append(f"{operation}: {after['throughput']:.1f} req/s vs {before['throughput']:.1f} req/s "
+                               f"(-{(1 - after['throughput'] / before['throughput']) * 100:.0f}%)")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{operation}: {after['errors']} errors vs {before['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", help="directory written by benchmarks.datagen")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds run before measuring")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--transport", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results saved by --save")
+    parser.add_argument("--max-p95-regression", type=float, default=20, help="percent")
+    parser.add_argument("--max-throughput-drop", type=float, default=15, help="percent")
+    args = parser.parse_args()
+
+    dataset_dir = os.path.abspath(args.dataset)
+    if not os.path.exists(os.path.join(dataset_dir, "maboutique.db")):
+        sys.exit(f"❌ No dataset in {dataset_dir}: run `python -m benchmarks.datagen --output {args.dataset}`")
+    # The generated users' hashes use 4 rounds: keep login from rehashing them
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    # Virtual users all come from one address: measure capacity, not the rate limits
+    os.environ.setdefault("RATE_LIMITING", "off")
+
+    options = dict(dataset=load_description(dataset_dir), mix=args.mix, users=args.users,
+                   duration=args.duration, warmup=args.warmup, seed=args.seed)
+    if args.transport == "asgi":
+        results = asyncio.run(run_in_process(dataset_dir, **options))
+    else:
+        results = run_over_http(dataset_dir, args.port, **options)
+    results["config"]["transport"] = args.transport
+    report(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_p95_regression, args.max_throughput_drop)
+        if regressions:
+            print(f"\n❌ Regressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\n✅ Within {args.max_p95_regression:.0f}% p95 and {args.max_throughput_drop:.0f}% "
+              f"throughput of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Helpers to run the API under uvicorn for a benchmark.
+"""
+
+import asyncio
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.client import HttpClient
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for_server(url: str, timeout: float = 30):
+    async def probe():
+        client = HttpClient(url)
+        try:
+            await client.request("GET", "/")
+        finally:
+            await client.close()
+
+    stop = time.time() + timeout
+    while time.time() < stop:
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up")
+
+
+@contextlib.contextmanager
+def serve(port: int, env: dict = None, database_dir: str = BACKEND_DIR):
+    """Run `uvicorn main:app` on a scratch copy of `database_dir`/maboutique.db, yield its URL"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Work on a copy so the benchmark never touches the real database
+        # (with its WAL file, which may still hold committed pages)
+        for name in ("maboutique.db", "maboutique.db-wal"):
+            if os.path.exists(os.path.join(database_dir, name)):
+                shutil.copy(os.path.join(database_dir, name), tmp)
+        # Every benchmark client shares 127.0.0.1: keep per-client rate limits
+        # out of the measurement unless the caller turns them back on
+        server_env = dict(os.environ, PYTHONPATH=BACKEND_DIR, RATE_LIMITING="off")
+        server_env.update(env or {})
+        # The deploy step: workers refuse to start on a database that is behind
+        subprocess.run(
+            [sys.executable, os.path.join(BACKEND_DIR, "migrations.py")],
+            cwd=tmp, env=server_env, check=True, stdout=subprocess.DEVNULL,
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=tmp, env=server_env,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}"
+            wait_for_server(url)
+            yield url
+        finally:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+from fastapi import Response
+
+# ============================================
+# IN-PROCESS CATALOG READ CACHE
+# ============================================
+
+
+class CachedResponse(NamedTuple):
+    """A response body that has already been serialized to JSON"""
+    body: bytes
+    headers: dict
+
+    def to_response(self) -> Response:
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Keys are tuples whose first element is a namespace ("article",
+    "featured", ...) so that a write can drop every page of a listing at
+    once with invalidate_namespace().
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value, ttl: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_prefix(self, *prefix):
+        """Drop every key starting with `prefix`, e.g. all variants of one article"""
+        with self._lock:
+            stale = [key for key in self._data if key[:len(prefix)] == prefix]
+            for key in stale:
+                del self._data[key]
+
+    def invalidate_namespace(self, *namespaces: str):
+        with self._lock:
+            stale = [key for key in self._data if key[0] in namespaces]
+            for key in stale:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Catalog data changes rarely; writes invalidate explicitly, the TTL only
+# bounds how long a write made by another process can go unnoticed.
+catalog_cache = TTLCache(maxsize=2048, ttl=300.0)
+
+ARTICLE_LISTS = ("featured", "on-sale")
+CATEGORY_LISTS = ("categories",)
+
+
+def invalidate_article(article_id: Optional[int]):
+    """Drop an article and every cached listing it may appear in"""
+    if article_id is not None:
+        catalog_cache.invalidate_prefix("article", article_id)
+    catalog_cache.invalidate_namespace(*ARTICLE_LISTS)
+
+
+def invalidate_category(category_id: Optional[int]):
+    """Drop a category and the cached category listings"""
+    if category_id is not None:
+        catalog_cache.invalidate(("category", category_id))
+    catalog_cache.invalidate_namespace(*CATEGORY_LISTS)
+
+
+# ============================================
+# AUTHENTICATION CACHES
+# ============================================
+
+# sha256(token) -> username, kept until the token's own `exp` at the latest
+token_cache = TTLCache(maxsize=10_000, ttl=600.0)
+
+# username -> detached User row; short TTL so out-of-process changes show up fast
+user_cache = TTLCache(maxsize=10_000, ttl=30.0)
+
+
+def invalidate_user(username: Optional[str]):
+    if username is not None:
+        user_cache.invalidate(username)
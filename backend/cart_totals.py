@@ -0,0 +1,112 @@
+from datetime import datetime
+from sqlalchemy import case, func, literal, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal, async_read_engine
+from models import Article, CartItem, CartTotals
+
+# ============================================
+# INCREMENTAL CART TOTALS
+# ============================================
+#
+# One `cart_totals` row per user holds the figures GET /cart used to
+# recompute from every line. Mutations apply a delta in a single UPDATE;
+# when the row is missing (never built, or dropped because an article
+# price changed) it is rebuilt from the cart on the next read.
+
+
+def line_amounts(article: Article, quantity: int):
+    """(subtotal, discount) contributed by `quantity` units of `article`"""
+    amount = article.price * quantity
+    discount = amount * (article.discount_percentage / 100) if article.discount_percentage > 0 else 0.0
+    return amount, discount
+
+
+async def apply_cart_delta(db: AsyncSession, user_id: int, article: Article, quantity_delta: int):
+    """Shift the user's totals by `quantity_delta` units of `article`"""
+    if not quantity_delta:
+        return
+    amount, discount = line_amounts(article, quantity_delta)
+    await apply_totals_delta(db, user_id, quantity_delta, amount, discount)
+
+
+async def apply_totals_delta(db: AsyncSession, user_id: int, items_delta: int, amount: float, discount: float):
+    """Shift the user's totals by precomputed amounts, in one UPDATE"""
+    emptied = CartTotals.total_items + items_delta <= 0
+    await db.execute(
+        update(CartTotals)
+        .where(CartTotals.user_id == user_id)
+        .values(
+            total_items=case((emptied, 0), else_=CartTotals.total_items + items_delta),
+            # Snap back to exact zeros once the cart is empty so float drift never accumulates
+            subtotal=case((emptied, 0.0), else_=CartTotals.subtotal + amount),
+            total_discount=case((emptied, 0.0), else_=CartTotals.total_discount + discount),
+            updated_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def reset_cart_totals(db: AsyncSession, user_id: int):
+    await db.execute(
+        update(CartTotals)
+        .where(CartTotals.user_id == user_id)
+        .values(total_items=0, subtotal=0.0, total_discount=0.0, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_cart_totals(db: AsyncSession, user_id: int) -> dict:
+    """The user's cart totals: a single-row lookup, rebuilding the row if it is missing"""
+    stmt = select(CartTotals.total_items, CartTotals.subtotal, CartTotals.total_discount).where(
+        CartTotals.user_id == user_id
+    )
+    row = (await db.execute(stmt)).first()
+
+    if row is None:
+        if db.bind is async_read_engine:
+            # A read-only session cannot store the row: rebuild it on the writer
+            async with AsyncSessionLocal() as writer:
+                return await _rebuild_cart_totals(writer, user_id, stmt)
+        return await _rebuild_cart_totals(db, user_id, stmt)
+    return _totals(row)
+
+
+async def _rebuild_cart_totals(db: AsyncSession, user_id: int, stmt) -> dict:
+    """Aggregate the cart into its totals row, then read it back"""
+    # Aggregate and store in one INSERT ... SELECT so a cart mutation
+    # committing in between can never leave a stale row behind
+    line_amount = Article.price * CartItem.quantity
+    line_discount = case(
+        (Article.discount_percentage > 0, line_amount * Article.discount_percentage / 100),
+        else_=0.0,
+    )
+    aggregate = (
+        select(
+            literal(user_id),
+            func.coalesce(func.sum(CartItem.quantity), 0),
+            func.coalesce(func.sum(line_amount), 0.0),
+            func.coalesce(func.sum(line_discount), 0.0),
+            literal(datetime.utcnow()),
+        )
+        .select_from(CartItem)
+        .join(Article, Article.id == CartItem.article_id)
+        .where(CartItem.user_id == user_id)
+    )
+    await db.execute(
+        insert(CartTotals)
+        .from_select(["user_id", "total_items", "subtotal", "total_discount", "updated_at"], aggregate)
+        .on_conflict_do_nothing(index_elements=[CartTotals.user_id])
+    )
+    await db.commit()
+    return _totals((await db.execute(stmt)).one())
+
+
+def _totals(row) -> dict:
+    total_items, subtotal, total_discount = row
+    return {
+        "total_items": total_items,
+        "subtotal": subtotal,
+        "total_discount": total_discount,
+        "total": subtotal - total_discount,
+    }
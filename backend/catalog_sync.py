@@ -0,0 +1,273 @@
+import asyncio
+import gzip
+import logging
+import os
+from typing import NamedTuple, Optional
+from sqlalchemy import DDL, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import catalog_cache, invalidate_article, invalidate_category, token_cache, user_cache
+from models import Article, Category, CatalogChange, CatalogVersion
+from serialization import ARTICLE_COLUMNS, CATEGORY_COLUMNS, dump_rows
+
+# ============================================
+# CATALOG CHANGE LOG
+# ============================================
+#
+# Every write to `articles` or `categories` bumps the single-row catalog
+# version and records, per entity, the version at which it last changed.
+# Like the search index, this is maintained by triggers, so ORM writes,
+# Core statements (checkout stock decrements) and raw SQL all count.
+
+CATALOG_TABLES = {"articles": "article", "categories": "category"}
+
+
+def _change_trigger(table: str, entity: str, operation: str) -> str:
+    row = "old" if operation == "DELETE" else "new"
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_catalog_{operation.lower()} AFTER {operation} ON {table} BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+        INSERT INTO catalog_changes(entity, entity_id, version)
+        VALUES ('{entity}', {row}.id, (SELECT version FROM catalog_version WHERE id = 1))
+        ON CONFLICT(entity, entity_id) DO UPDATE SET version = excluded.version;
+    END
+    """
+
+
+CHANGE_LOG_DDL = [
+    "INSERT OR IGNORE INTO catalog_version(id, version) VALUES (1, 0)",
+] + [
+    _change_trigger(table, entity, operation)
+    for table, entity in CATALOG_TABLES.items()
+    for operation in ("INSERT", "UPDATE", "DELETE")
+]
+
+
+def create_change_log(engine):
+    """Seed the version counter and create the change triggers"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        for statement in CHANGE_LOG_DDL:
+            conn.execute(DDL(statement))
+
+
+# Users are not part of the catalog, but every worker caches principals
+# (user_cache) and must drop them when another process deactivates,
+# renames or deletes a user. Those writes bump a counter of their own, row
+# USER_VERSION_ID of catalog_version, so the catalog version that clients
+# see never moves for them.
+USER_VERSION_ID = 2
+
+USER_CHANGE_DDL = [
+    f"INSERT OR IGNORE INTO catalog_version(id, version) VALUES ({USER_VERSION_ID}, 0)",
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_cache_{operation.lower()} AFTER {operation} ON users BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = {USER_VERSION_ID};
+    END
+    """
+    for operation in ("UPDATE", "DELETE")
+]
+
+
+def create_user_change_counter(engine):
+    """Seed the user version counter and create its triggers"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        for statement in USER_CHANGE_DDL:
+            conn.execute(DDL(statement))
+
+
+async def current_version(db: AsyncSession) -> int:
+    return await db.scalar(select(CatalogVersion.version).where(CatalogVersion.id == 1)) or 0
+
+
+# ============================================
+# SNAPSHOT
+# ============================================
+
+
+class CatalogSnapshot(NamedTuple):
+    version: int
+    body: bytes
+    gzipped: bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"catalog-{self.version}"'
+
+
+async def load_catalog(db: AsyncSession) -> dict:
+    """Active categories and articles, with the version they are at least as new as"""
+    # Read the version first: rows changed in between are then also
+    # reported by the next delta, which clients apply idempotently
+    version = await current_version(db)
+    categories = await db.execute(
+        select(*CATEGORY_COLUMNS).where(Category.is_active == True).order_by(Category.id)
+    )
+    articles = await db.execute(
+        select(*ARTICLE_COLUMNS).where(Article.is_active == True).order_by(Article.id)
+    )
+    return {
+        "version": version,
+        "categories": [dict(row) for row in categories.mappings()],
+        "articles": [dict(row) for row in articles.mappings()],
+    }
+
+
+class SnapshotCache:
+    """
+    The serialized and gzipped catalog for the latest version seen.
+
+    Built at most once per catalog version per process: concurrent
+    requests for a stale snapshot wait for the single rebuild.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        # Created on first use, inside the worker's event loop: the module
+        # may be imported before it exists (preloaded app)
+        self._lock: Optional[asyncio.Lock] = None
+        self.builds = 0
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        version = await current_version(db)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version >= version:
+            return snapshot
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version < version:
+                catalog = await load_catalog(db)
+                body = dump_rows(catalog)
+                snapshot = CatalogSnapshot(catalog["version"], body, gzip.compress(body, mtime=0))
+                self._snapshot = snapshot
+                self.builds += 1
+        return snapshot
+
+
+catalog_snapshot = SnapshotCache()
+
+
+# ============================================
+# DELTAS
+# ============================================
+
+
+async def load_changes(db: AsyncSession, since: int) -> dict:
+    """Categories and articles changed after version `since`, split into upserts and removals"""
+    version = await current_version(db)
+    categories, removed_categories = await _changed_rows(db, Category, "category", CATEGORY_COLUMNS, since)
+    articles, removed_articles = await _changed_rows(db, Article, "article", ARTICLE_COLUMNS, since)
+    return {
+        "version": version,
+        "categories": categories,
+        "removed_category_ids": removed_categories,
+        "articles": articles,
+        "removed_article_ids": removed_articles,
+    }
+
+
+async def _changed_rows(db: AsyncSession, model, entity: str, columns: list, since: int):
+    """(active rows changed after `since`, ids changed after `since` that are deactivated or deleted)"""
+    changed = (CatalogChange.entity == entity) & (CatalogChange.version > since)
+    result = await db.execute(
+        select(*columns)
+        .join(CatalogChange, CatalogChange.entity_id == model.id)
+        .where(changed, model.is_active == True)
+        .order_by(model.id)
+    )
+    rows = [dict(row) for row in result.mappings()]
+    removed = await db.scalars(
+        select(CatalogChange.entity_id)
+        .outerjoin(model, model.id == CatalogChange.entity_id)
+        .where(changed, or_(model.id.is_(None), model.is_active.is_not(True)))
+        .order_by(CatalogChange.entity_id)
+    )
+    return rows, removed.all()
+
+
+# ============================================
+# CROSS-WORKER CACHE COHERENCE
+# ============================================
+#
+# Each worker process has its own catalog cache, and only sees its own
+# writes. A background task polls the catalog and user versions (one read
+# of the two-row catalog_version table) and, when another process has
+# changed the catalog, drops exactly the entries the change log names
+# since the version it last saw. A user change drops the authentication
+# caches as a whole: user writes are rare, and the log does not name them.
+
+CATALOG_POLL_INTERVAL = float(os.getenv("CATALOG_POLL_INTERVAL", "1.0"))
+# Beyond this many changed entities (a bulk import), clearing is cheaper
+MAX_TARGETED_INVALIDATIONS = 1000
+
+logger = logging.getLogger("maboutique.catalog_sync")
+
+
+class CatalogVersionWatcher:
+    def __init__(self, interval: float = CATALOG_POLL_INTERVAL):
+        self.interval = interval
+        self.version: Optional[int] = None
+        self.user_version: Optional[int] = None
+        self.invalidations = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def sync(self, db: AsyncSession):
+        """Invalidate what changed since the last sync; the first one only records the versions"""
+        versions = dict((await db.execute(select(CatalogVersion.id, CatalogVersion.version))).all())
+        version, user_version = versions.get(1, 0), versions.get(USER_VERSION_ID, 0)
+        if self.version is None:
+            self.version, self.user_version = version, user_version
+            return
+        if user_version > self.user_version:
+            user_cache.clear()
+            token_cache.clear()
+            self.user_version = user_version
+        if version <= self.version:
+            return
+        result = await db.execute(
+            select(CatalogChange.entity, CatalogChange.entity_id)
+            .where(CatalogChange.version > self.version)
+            .limit(MAX_TARGETED_INVALIDATIONS + 1)
+        )
+        changes = result.all()
+        if len(changes) > MAX_TARGETED_INVALIDATIONS:
+            catalog_cache.clear()
+        else:
+            for entity, entity_id in changes:
+                if entity == "article":
+                    invalidate_article(entity_id)
+                else:
+                    invalidate_category(entity_id)
+        self.invalidations += 1
+        self.version = version
+
+    async def _run(self, session_factory):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with session_factory() as db:
+                    await self.sync(db)
+            except Exception:
+                # Keep polling: the TTL still bounds staleness meanwhile
+                logger.exception("catalog version poll failed")
+
+    def start(self, session_factory):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+catalog_watcher = CatalogVersionWatcher()
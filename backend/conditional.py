@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Sequence
+from fastapi import Request, Response, status
+
+# ============================================
+# CONDITIONAL GET (ETag / Last-Modified)
+# ============================================
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime (as stored by the models) as an HTTP date"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _field(item, name: str):
+    """Attribute of an ORM object, or key of a row dict"""
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def validators(items: Sequence, version_attr: str, variant: str = "") -> dict:
+    """
+    ETag and Last-Modified headers for a result set.
+
+    Derived from the row count, the ids and the newest `version_attr`
+    (updated_at for articles), so they are computed from the loaded rows
+    (ORM objects or row dicts) without serializing anything. The column
+    must change on every edit of a row: see body_validators() otherwise.
+    `variant` tells apart representations of the same rows, such as
+    different `fields=` selections.
+    """
+    versions = [_field(item, version_attr) for item in items]
+    last_modified = max((v for v in versions if v is not None), default=None)
+    parts = [
+        str(len(items)),
+        last_modified.isoformat() if last_modified else "",
+        ",".join(str(_field(item, "id")) for item in items),
+    ]
+    if variant:
+        parts.append(variant)
+    fingerprint = "|".join(parts)
+    headers = {"ETag": '"' + hashlib.sha1(fingerprint.encode()).hexdigest() + '"'}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def body_validators(body: bytes) -> dict:
+    """
+    ETag for an already serialized body, for rows with no column that
+    changes on every edit (categories only have created_at). There is no
+    date to send as Last-Modified, so If-None-Match alone revalidates.
+    """
+    return {"ETag": '"' + hashlib.sha1(body).hexdigest() + '"'}
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def is_not_modified(request: Request, headers: dict) -> bool:
+    """True when the client's cached copy, described by the request's conditional headers, is still valid"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+        etag = headers.get("ETag")
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    since = _parse_http_date(if_modified_since)
+    modified = _parse_http_date(last_modified)
+    return since is not None and modified is not None and modified <= since
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
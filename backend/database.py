@@ -1,25 +1,124 @@
-from sqlalchemy import create_engine
+import asyncio
+import os
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from models import Base
+from metrics import instrument_engine, timed_pool
+from slow_queries import install_slow_query_log
 
 # Database URL - SQLite for now, easy to change later
 SQLALCHEMY_DATABASE_URL = "sqlite:///./maboutique.db"
+# Same database through the async driver, used by the API handlers
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./maboutique.db"
 
+# ============================================
+# CONNECTION PROFILE
+# ============================================
+
+# Applied to every new connection. SQLITE_TUNING=off keeps SQLite's
+# defaults (rollback journal), to compare against in benchmarks.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",           # readers and the writer no longer block each other
+    "synchronous": "NORMAL",         # fsync at checkpoints only, which WAL makes safe
+    "busy_timeout": 5000,            # wait up to 5s for a lock instead of "database is locked"
+    "mmap_size": 256 * 1024 * 1024,  # read pages straight from the OS page cache
+    "cache_size": -64000,            # 64 MB page cache per connection
+    "temp_store": "MEMORY",          # sorts and temp indexes stay off disk
+}
+if os.getenv("SQLITE_TUNING", "on") == "off":
+    SQLITE_PRAGMAS = {}
+
+READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+
+
+def apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    # SQLite leaves foreign keys unenforced unless asked, per connection; the
+    # cart and wishlist upserts rely on them to reject unknown articles
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def make_read_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+# Sync engine: schema setup and offline scripts
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
     connect_args={"check_same_thread": False}  # Only needed for SQLite
 )
+event.listen(engine, "connect", apply_pragmas)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create all tables
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+# Async engines: request handlers never block a threadpool worker on I/O.
+#
+# SQLite runs one write transaction at a time anyway, so mutations share a
+# single connection and queue for it in the pool instead of racing for the
+# file lock. Catalog reads get their own pool of read-only connections,
+# which WAL lets run alongside the writer.
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=timed_pool("write"), pool_size=1, max_overflow=0
+)
+event.listen(async_engine.sync_engine, "connect", apply_pragmas)
+instrument_engine(async_engine, "write")
+install_slow_query_log(async_engine, "write")
+
+async_read_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=timed_pool("read"), pool_size=READ_POOL_SIZE, max_overflow=0
+)
+event.listen(async_read_engine.sync_engine, "connect", apply_pragmas)
+event.listen(async_read_engine.sync_engine, "connect", make_read_only)
+instrument_engine(async_read_engine, "read")
+install_slow_query_log(async_read_engine, "read")
+
+# expire_on_commit=False: objects stay readable after commit, since an
+# implicit refresh would need I/O outside of an await
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Read-only session for endpoints that never write
+async def get_read_db():
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+# Open every pooled connection up front (connect + pragmas), so the first
+# requests a worker serves do not pay for it
+async def prime_pools():
+    session_factories = [AsyncSessionLocal] + [AsyncReadSessionLocal] * READ_POOL_SIZE
+    # A pool's first connection runs its first_connect event under a thread
+    # lock: concurrent first connects on one event loop would deadlock it
+    for session_factory in (AsyncSessionLocal, AsyncReadSessionLocal):
+        async with session_factory() as db:
+            await db.execute(text("SELECT 1"))
+    all_open = asyncio.Event()
+    opened = 0
+    
+    async def ping(session_factory):
+        nonlocal opened
+        try:
+            async with session_factory() as db:
+                await db.execute(text("SELECT 1"))
+                opened += 1
+                if opened == len(session_factories):
+                    all_open.set()
+                # Hold the connection until all are open, so each ping gets its own
+                await all_open.wait()
+        finally:
+            all_open.set()
+    
+    await asyncio.gather(*(ping(session_factory) for session_factory in session_factories))
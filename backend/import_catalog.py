@@ -0,0 +1,262 @@
+"""
+Bulk catalog import for MaBoutique
+Streams a supplier feed (CSV or JSONL) into the articles table, upserting on SKU
+
+    python import_catalog.py feed.jsonl
+    python import_catalog.py feed.csv --chunk-size 10000
+
+Each record needs `sku`, `name`, `price` and `category` (a category name,
+created on first use). Optional: description, brand, image_url, sizes,
+colors, stock_quantity, is_featured, is_active, discount_percentage,
+rating, review_count. In CSV, sizes and colors are "|"-separated
+("S|M|L"); in JSONL they are lists.
+
+The feed is read in chunks, so memory stays flat whatever its size. Each
+chunk is written in its own transaction with one executemany'd upsert:
+new SKUs are inserted and known ones updated in place, unless no feed
+column changed. Unchanged rows are left alone (no write, no catalog
+change for clients to sync) and counted apart.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import Article, CartItem, CartTotals, Category
+
+DEFAULT_CHUNK_SIZE = 5000
+LIST_SEPARATOR = "|"
+
+# Feed columns written on both insert and update; created_at only on insert,
+# updated_at only when another of these changed
+UPDATED_COLUMNS = [
+    "name", "description", "price", "brand", "category_id", "image_url", "sizes", "colors",
+    "stock_quantity", "is_featured", "is_active", "discount_percentage", "rating", "review_count",
+    "updated_at",
+]
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+# ============================================
+# READING
+# ============================================
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Union[dict, InvalidRecord]]:
+    """
+    Yield one dict per feed record, streaming from disk. A JSONL line that
+    does not parse yields an InvalidRecord in its place, which the import
+    counts as rejected instead of stopping at it.
+    """
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, newline="", encoding="utf-8") as feed:
+        if fmt == "csv":
+            yield from csv.DictReader(feed)
+        else:
+            for line in feed:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield InvalidRecord(f"malformed JSON: {e}")
+
+
+def chunked(records: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _list(value) -> Optional[List[str]]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = value.split(LIST_SEPARATOR)
+    return [str(item).strip() for item in value if str(item).strip()] or None
+
+
+def _bool(value, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _number(value, cast, default):
+    if value is None or value == "":
+        return default
+    return cast(value)
+
+
+def normalize(record: dict, now: datetime) -> Tuple[dict, str]:
+    """(article row without category_id, category name) for one feed record"""
+    if isinstance(record, InvalidRecord):
+        raise record
+    if not isinstance(record, dict):
+        raise InvalidRecord("not a JSON object")
+    sku, name, category = _text(record.get("sku")), _text(record.get("name")), _text(record.get("category"))
+    if not sku or not name or not category:
+        raise InvalidRecord("sku, name and category are required")
+    try:
+        row = {
+            "sku": sku,
+            "name": name,
+            "description": _text(record.get("description")),
+            "price": float(record["price"]),
+            "brand": _text(record.get("brand")),
+            "image_url": _text(record.get("image_url")),
+            "sizes": _list(record.get("sizes")),
+            "colors": _list(record.get("colors")),
+            "stock_quantity": _number(record.get("stock_quantity"), int, 0),
+            "is_featured": _bool(record.get("is_featured"), False),
+            "is_active": _bool(record.get("is_active"), True),
+            "discount_percentage": _number(record.get("discount_percentage"), float, 0.0),
+            "rating": _number(record.get("rating"), float, 0.0),
+            "review_count": _number(record.get("review_count"), int, 0),
+            "created_at": now,
+            "updated_at": now,
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidRecord(f"bad value: {e}")
+    return row, category
+
+
+# ============================================
+# WRITING
+# ============================================
+
+class CatalogImporter:
+    """Upserts feed records into `articles`, one transaction per chunk"""
+
+    def __init__(self, engine, chunk_size: int = DEFAULT_CHUNK_SIZE, log=print):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.log = log
+        self.categories: Dict[str, int] = {}
+        # Totals over every import_records() call
+        self.imported = 0
+        self.unchanged = 0
+        self.rejected = 0
+
+        table = Article.__table__
+        insert_stmt = sqlite_insert(table)
+        self.upsert = insert_stmt.on_conflict_do_update(
+            index_elements=[table.c.sku],
+            set_={name: insert_stmt.excluded[name] for name in UPDATED_COLUMNS},
+            where=or_(*(
+                table.c[name].is_distinct_from(insert_stmt.excluded[name])
+                for name in UPDATED_COLUMNS if name != "updated_at"
+            )),
+        )
+
+    def _load_categories(self, conn):
+        """All category ids by name, read once per import"""
+        self.categories = dict(conn.execute(select(Category.name, Category.id)).all())
+
+    def _category_id(self, conn, name: str) -> int:
+        if name not in self.categories:
+            result = conn.execute(insert(Category).values(
+                name=name,
+                description=f"Browse our collection of {name.lower()}",
+                is_active=True,
+                created_at=datetime.utcnow(),
+            ))
+            self.categories[name] = result.inserted_primary_key[0]
+        return self.categories[name]
+
+    def import_records(self, records: Iterable[dict]) -> dict:
+        start = time.perf_counter()
+        imported = unchanged = rejected = 0
+        with self.engine.connect() as conn:
+            self._load_categories(conn)
+
+        for number, chunk in enumerate(chunked(records, self.chunk_size)):
+            now = datetime.utcnow()
+            rows = []
+            with self.engine.begin() as conn:
+                for offset, record in enumerate(chunk):
+                    try:
+                        row, category = normalize(record, now)
+                    except InvalidRecord as e:
+                        rejected += 1
+                        self.log(f"⚠️  record {number * self.chunk_size + offset + 1} skipped: {e}")
+                        continue
+                    row["category_id"] = self._category_id(conn, category)
+                    rows.append(row)
+                if rows:
+                    # Counts inserted and updated rows, not the ones the WHERE skipped
+                    written = conn.execute(self.upsert, rows).rowcount
+                    self._drop_stale_cart_totals(conn, [row["sku"] for row in rows])
+                    imported += written
+                    unchanged += len(rows) - written
+
+            elapsed = time.perf_counter() - start
+            self.log(f"📦 {imported:,} articles imported, {unchanged:,} unchanged "
+                     f"({(imported + unchanged) / elapsed:,.0f} rows/s)")
+
+        self.imported += imported
+        self.unchanged += unchanged
+        self.rejected += rejected
+        elapsed = time.perf_counter() - start
+        return {
+            "imported": imported,
+            "unchanged": unchanged,
+            "rejected": rejected,
+            "seconds": elapsed,
+            "rows_per_second": (imported + unchanged) / elapsed if elapsed else 0.0,
+        }
+
+    @staticmethod
+    def _drop_stale_cart_totals(conn, skus: List[str]):
+        """Prices may have changed: let carts holding these articles rebuild their totals"""
+        carts = (
+            select(CartItem.user_id)
+            .join(Article, Article.id == CartItem.article_id)
+            .where(Article.sku.in_(skus))
+        )
+        conn.execute(delete(CartTotals).where(CartTotals.user_id.in_(carts)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV or JSONL feed")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        sys.exit(f"❌ No such file: {args.path}")
+
+    from database import engine
+    from migrations import migrate
+    migrate(engine)
+
+    print(f"🚀 Importing {args.path}...")
+    stats = CatalogImporter(engine, args.chunk_size).import_records(read_records(args.path, args.format))
+    print(f"\n🎉 {stats['imported']:,} articles imported, {stats['unchanged']:,} unchanged, "
+          f"{stats['rejected']:,} rejected "
+          f"in {stats['seconds']:.1f}s ({stats['rows_per_second']:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
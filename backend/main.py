@@ -1,35 +1,155 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+import asyncio
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, delete, insert, update, literal_column
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
-from database import get_db, create_tables
-from models import User, Article, Category, CartItem, WishlistItem
+from datetime import datetime
+from database import engine, get_db, get_read_db, prime_pools, AsyncReadSessionLocal
+from models import User, Article, Category, CartItem, WishlistItem, Order, order_items, CART_LINE_KEY
 from schemas import (
     UserCreate, UserLogin, UserResponse, Token,
     ArticleResponse, CategoryResponse,
-    CartItemCreate, CartItemUpdate, CartItemResponse, CartSummary,
+    CartItemCreate, CartItemUpdate, CartItemResponse, CartSummary, CartTotalsResponse,
+    CartBatchRequest, CartBatchResponse,
+    OrderCreate, OrderResponse,
+    CatalogSnapshotResponse, CatalogChangesResponse,
     WishlistItemCreate, WishlistItemResponse
 )
-from auth import verify_password, get_password_hash, create_access_token, verify_token
-
-# Create tables on startup
-create_tables()
+from auth import create_access_token, verify_token
+from passwords import password_hasher
+from search import search_articles_query, search_sort_keys
+from pagination import paginate, NEXT_CURSOR_HEADER
+from cache import catalog_cache, token_cache, user_cache, CachedResponse, invalidate_article, invalidate_user
+from cart_totals import apply_cart_delta, apply_totals_delta, line_amounts, reset_cart_totals, get_cart_totals
+from conditional import validators, body_validators, is_not_modified, not_modified
+from catalog_sync import catalog_snapshot, catalog_watcher, load_changes
+from serialization import CATEGORY_COLUMNS, dump_rows, parse_article_fields, article_columns, project_rows
+from migrations import check_schema
+from rate_limit import ROUTE_CLASSES, admission, check_login_attempts, record_failed_login
+from metrics import MetricsMiddleware, metrics, render_metrics, METRICS_CONTENT_TYPE
 
 app = FastAPI(title="MaBoutique API", version="1.0.0", description="API for MaBoutique Shop")
+app.add_middleware(MetricsMiddleware)
+
+# The schema is set up by `python migrations.py` at deploy time; a worker
+# only refuses to serve a database that is behind
+@app.on_event("startup")
+async def verify_schema():
+    check_schema(engine)
+
+@app.on_event("startup")
+async def start_password_pool():
+    password_hasher.start()
+
+@app.on_event("shutdown")
+async def stop_password_pool():
+    password_hasher.shutdown()
+
+# Every pooled connection stayed busy for the pool timeout: shed the request
+# like the other overload paths instead of failing with a 500
+@app.exception_handler(PoolTimeoutError)
+async def pool_exhausted(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 security = HTTPBearer()
 
-# Helper function to get current user
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+# Sparse fieldsets on the article endpoints
+FIELDS_QUERY = Query(None, description="Comma-separated ArticleResponse fields to return, e.g. id,name,price")
+
+def fields_variant(selected) -> str:
+    """ETag variant for a parsed `fields=` selection"""
+    return ",".join(selected) if selected else ""
+
+def with_next_cursor(headers: dict, response: Optional[Response] = None) -> dict:
+    """Copy the next-page cursor, when there is one, into `headers`"""
+    if response is not None and NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return headers
+
+def response_headers(items, version_attr: str, response: Optional[Response] = None, variant: str = "") -> dict:
+    """Validators for a result set, plus the next-page cursor when there is one"""
+    return with_next_cursor(validators(items, version_attr, variant), response)
+
+def content_validated_json(request: Request, rows, key, response: Optional[Response] = None) -> Response:
+    """
+    Encode rows (or one row) and validate them by their JSON, for tables
+    with no column that changes on every edit; keeps the JSON in the
+    catalog cache under `key`
+    """
+    body = dump_rows(rows)
+    headers = with_next_cursor(body_validators(body), response)
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return catalog_cache.set(key, CachedResponse(body, headers)).to_response()
+
+def rows_json(rows, headers: dict, key=None) -> Response:
+    """Encode column rows (or one row) as they are, keeping the JSON in the catalog cache under `key` if given"""
+    cached = CachedResponse(dump_rows(rows), headers)
+    if key is not None:
+        catalog_cache.set(key, cached)
+    return cached.to_response()
+
+def serve_cached(request: Request, cached: CachedResponse) -> Response:
+    if is_not_modified(request, cached.headers):
+        return not_modified(cached.headers)
+    return cached.to_response()
+
+def snapshot_user(user: User) -> User:
+    """Detached copy of a user row that can be shared between sessions"""
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+def cart_line_key(article_id: int, size: Optional[str], color: Optional[str]) -> tuple:
+    """A user's cart line key as uq_cart_items_line compares it (CART_LINE_KEY)"""
+    return (article_id, size or "", color or "")
+
+async def find_user(*criteria) -> Optional[User]:
+    """
+    Look a user up on a reader of its own and return a detached copy. The
+    connection goes back to the pool before the caller awaits anything
+    slower (bcrypt, the write connection), so a burst of such requests
+    never holds every reader.
+    """
+    async with AsyncReadSessionLocal() as read_db:
+        result = await read_db.execute(select(User).where(*criteria))
+        user = result.scalars().first()
+        return snapshot_user(user) if user is not None else None
+
+# Helper function to get current user. Handlers only use the principal's
+# id and flags and never write through it, so it is a detached copy,
+# whichever session the handler itself uses.
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     username = verify_token(token)
     
-    user = db.query(User).filter(User.username == username).first()
+    # Recently seen users are served without a query
+    cached = user_cache.get(username)
+    if cached is not None:
+        return snapshot_user(cached)
+    
+    user = await find_user(User.username == username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    user_cache.set(username, snapshot_user(user))
     return user
 
 # ============================================
@@ -37,19 +157,56 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 # ============================================
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome to MaBoutique API!", "status": "running"}
 
+# ============================================
+# METRICS ENDPOINT
+# ============================================
+
+def process_metrics():
+    """Cache, password pool and catalog snapshot state, read at scrape time"""
+    caches = {"catalog": catalog_cache, "token": token_cache, "user": user_cache}
+    cache_stats = {name: cache.stats() for name, cache in caches.items()}
+    for stat, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        yield (f"maboutique_cache_{stat}" + ("_total" if kind == "counter" else ""), kind, f"In-process cache {stat}",
+               [({"cache": name}, stats[stat]) for name, stats in cache_stats.items()])
+    
+    hasher = password_hasher.stats()
+    for stat, kind in (("in_flight", "gauge"), ("queued", "gauge"), ("completed", "counter"), ("rejected", "counter")):
+        yield (f"maboutique_password_{stat}" + ("_total" if kind == "counter" else ""), kind,
+               f"Password hashing pool {stat.replace('_', ' ')}", [({}, hasher[stat])])
+    
+    yield ("maboutique_catalog_snapshot_builds_total", "counter", "Catalog snapshots built",
+           [({}, catalog_snapshot.builds)])
+    admission_stats = {name: route_class.stats() for name, route_class in ROUTE_CLASSES.items()}
+    for stat, kind in (("in_flight", "gauge"), ("rate_limited", "counter"), ("shed", "counter")):
+        yield (f"maboutique_admission_{stat}" + ("_total" if kind == "counter" else ""), kind,
+               f"Admission control {stat.replace('_', ' ')} by route class",
+               [({"route_class": name}, stats[stat]) for name, stats in admission_stats.items()])
+    
+    yield ("maboutique_catalog_remote_invalidations_total", "counter",
+           "Catalog cache invalidations for changes seen by the version poll", [({}, catalog_watcher.invalidations)])
+
+metrics.register_collector(process_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of request, database and cache metrics"""
+    # Set as a header, not media_type: Starlette would append a second charset
+    return Response(content=render_metrics(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
 # ============================================
 # AUTH ENDPOINTS
 # ============================================
 
-@app.post("/auth/signup", response_model=Token)
-def signup(user_data: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    existing_user = db.query(User).filter(
-        (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+@app.post("/auth/signup", response_model=Token, dependencies=[Depends(admission("auth"))])
+async def signup(
+    user_data: UserCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    # Check if user already exists (no connection is held while bcrypt runs)
+    existing_user = await find_user((User.email == user_data.email) | (User.username == user_data.username))
     
     if existing_user:
         raise HTTPException(
@@ -57,8 +214,8 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Email or username already registered"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    # Create new user (bcrypt runs in the dedicated password worker pool)
+    hashed_password = await password_hasher.hash(user_data.password)
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -68,8 +225,15 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent signup took the username or email in the meantime
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email or username already registered"
+        )
     
     # Create access token
     access_token = create_access_token(data={"sub": user_data.username})
@@ -80,12 +244,24 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
         "user": UserResponse.from_orm(db_user)
     }
 
-@app.post("/auth/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    # Find user
-    user = db.query(User).filter(User.username == user_credentials.username).first()
+@app.post("/auth/login", response_model=Token, dependencies=[Depends(admission("auth"))])
+async def login(
+    user_credentials: UserLogin,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    check_login_attempts(user_credentials.username, request)
+    
+    # Find user (no connection is held while bcrypt runs; the writer is
+    # only needed to upgrade the hash)
+    user = await find_user(User.username == user_credentials.username)
+    
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await password_hasher.verify_and_update(user_credentials.password, user.hashed_password)
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not valid:
+        record_failed_login(user_credentials.username, request)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -98,6 +274,12 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Inactive user"
         )
     
+    # Stored hash uses an outdated bcrypt cost: upgrade it transparently
+    if new_hash:
+        await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+        await db.commit()
+        invalidate_user(user.username)
+    
     # Create access token
     access_token = create_access_token(data={"sub": user.username})
     
@@ -108,11 +290,11 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     }
 
 @app.get("/auth/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return UserResponse.from_orm(current_user)
 
 @app.get("/auth/test")
-def test_auth(current_user: User = Depends(get_current_user)):
+async def test_auth(current_user: User = Depends(get_current_user)):
     return {"message": f"Hello {current_user.username}! You are authenticated."}
 
 
@@ -121,23 +303,39 @@ def test_auth(current_user: User = Depends(get_current_user)):
 # ============================================
 
 @app.get("/categories", response_model=List[CategoryResponse])
-def get_categories(
+async def get_categories(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all active categories"""
-    categories = db.query(Category).filter(Category.is_active == True).offset(skip).limit(limit).all()
-    return categories
+    key = ("categories", skip, limit, cursor)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return serve_cached(request, cached)
+    
+    stmt = select(*CATEGORY_COLUMNS).where(Category.is_active == True)
+    categories = await paginate(db, stmt, (Category.id,), response, cursor, skip, limit)
+    # Validated by content: created_at does not change on a rename
+    return content_validated_json(request, categories, key, response)
 
 
 @app.get("/categories/{category_id}", response_model=CategoryResponse)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+async def get_category(category_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get a single category by ID"""
-    category = db.query(Category).filter(Category.id == category_id).first()
+    key = ("category", category_id)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return serve_cached(request, cached)
+    
+    result = await db.execute(select(*CATEGORY_COLUMNS).where(Category.id == category_id))
+    category = result.mappings().first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    return category
+    return content_validated_json(request, dict(category), key)
 
 
 # ============================================
@@ -146,79 +344,161 @@ def get_category(category_id: int, db: Session = Depends(get_db)):
 # ============================================
 
 @app.get("/articles/featured", response_model=List[ArticleResponse])
-def get_featured_articles(
+async def get_featured_articles(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get featured articles"""
-    articles = db.query(Article).filter(
+    selected = parse_article_fields(fields)
+    key = ("featured", skip, limit, cursor, selected)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return serve_cached(request, cached)
+    
+    stmt = select(*article_columns(selected)).where(
         Article.is_featured == True,
         Article.is_active == True
-    ).offset(skip).limit(limit).all()
-    return articles
+    )
+    articles = await paginate(db, stmt, (Article.id,), response, cursor, skip, limit)
+    headers = response_headers(articles, "updated_at", response, fields_variant(selected))
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return rows_json(project_rows(articles, selected), headers, key)
 
 
 @app.get("/articles/on-sale", response_model=List[ArticleResponse])
-def get_sale_articles(
+async def get_sale_articles(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get articles with discounts"""
-    articles = db.query(Article).filter(
-        Article.discount_percentage > 0,
+    selected = parse_article_fields(fields)
+    key = ("on-sale", skip, limit, cursor, selected)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return serve_cached(request, cached)
+    
+    # Literal 0 rather than a bound parameter, so ix_articles_on_sale applies
+    stmt = select(*article_columns(selected)).where(
+        Article.discount_percentage > literal_column("0"),
         Article.is_active == True
-    ).offset(skip).limit(limit).all()
-    return articles
+    )
+    articles = await paginate(db, stmt, (Article.id,), response, cursor, skip, limit)
+    headers = response_headers(articles, "updated_at", response, fields_variant(selected))
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return rows_json(project_rows(articles, selected), headers, key)
 
 
-@app.get("/articles/search", response_model=List[ArticleResponse])
-def search_articles(
+@app.get("/articles/search", response_model=List[ArticleResponse], dependencies=[Depends(admission("search"))])
+async def search_articles(
+    request: Request,
+    response: Response,
     q: str = Query(..., min_length=1),
     category_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Search articles by name or description"""
-    query = db.query(Article).filter(Article.is_active == True)
-    
-    # Search in name and description
-    search_filter = Article.name.ilike(f"%{q}%") | Article.description.ilike(f"%{q}%")
-    query = query.filter(search_filter)
-    
-    if category_id:
-        query = query.filter(Article.category_id == category_id)
+    """Search articles by name, brand or description, best matches first"""
+    selected = parse_article_fields(fields)
+    dialect = db.bind.dialect.name
+    stmt = search_articles_query(dialect, q, category_id, article_columns(selected))
     
-    articles = query.offset(skip).limit(limit).all()
-    return articles
+    articles = await paginate(db, stmt, search_sort_keys(dialect), response, cursor, skip, limit)
+    headers = response_headers(articles, "updated_at", response, fields_variant(selected))
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return rows_json(project_rows(articles, selected), headers)
 
 
 @app.get("/articles", response_model=List[ArticleResponse])
-def get_articles(
+async def get_articles(
+    request: Request,
+    response: Response,
     category_id: Optional[int] = Query(None),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all articles, optionally filtered by category"""
-    query = db.query(Article).filter(Article.is_active == True)
+    selected = parse_article_fields(fields)
+    stmt = select(*article_columns(selected)).where(Article.is_active == True)
     
     if category_id:
-        query = query.filter(Article.category_id == category_id)
+        stmt = stmt.where(Article.category_id == category_id)
     
-    articles = query.offset(skip).limit(limit).all()
-    return articles
+    articles = await paginate(db, stmt, (Article.id,), response, cursor, skip, limit)
+    headers = response_headers(articles, "updated_at", response, fields_variant(selected))
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return rows_json(project_rows(articles, selected), headers)
 
 
 @app.get("/articles/{article_id}", response_model=ArticleResponse)
-def get_article(article_id: int, db: Session = Depends(get_db)):
+async def get_article(
+    article_id: int,
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get a single article by ID"""
-    article = db.query(Article).filter(Article.id == article_id).first()
+    selected = parse_article_fields(fields)
+    key = ("article", article_id, selected)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return serve_cached(request, cached)
+    
+    result = await db.execute(select(*article_columns(selected)).where(Article.id == article_id))
+    article = result.mappings().first()
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
-    return article
+    article = dict(article)
+    headers = response_headers([article], "updated_at", variant=fields_variant(selected))
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return rows_json(project_rows([article], selected)[0], headers, key)
+
+
+# ============================================
+# CATALOG SYNC ENDPOINTS
+# ============================================
+
+@app.get("/catalog/snapshot", response_model=CatalogSnapshotResponse)
+async def get_catalog_snapshot(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Every active category and article, serialized and gzipped once per catalog version"""
+    snapshot = await catalog_snapshot.get(db)
+    headers = {"ETag": snapshot.etag, "Vary": "Accept-Encoding"}
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzipped, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@app.get("/catalog/changes", response_model=CatalogChangesResponse)
+async def get_catalog_changes(since: int = Query(..., ge=0), db: AsyncSession = Depends(get_read_db)):
+    """Categories and articles changed since `since`, a version from a snapshot or an earlier delta"""
+    changes = await load_changes(db, since)
+    if since > changes["version"]:
+        # Not a version this database ever had (it was replaced or restored)
+        raise HTTPException(status_code=409, detail="Unknown catalog version, fetch a new snapshot")
+    return Response(content=dump_rows(changes), media_type="application/json")
 
 
 # ============================================
@@ -226,100 +506,219 @@ def get_article(article_id: int, db: Session = Depends(get_db)):
 # ============================================
 
 @app.get("/cart", response_model=CartSummary)
-def get_cart(
+async def get_cart(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's cart with summary"""
-    cart_items = db.query(CartItem).filter(CartItem.user_id == current_user.id).all()
-    
-    total_items = sum(item.quantity for item in cart_items)
-    subtotal = 0.0
-    total_discount = 0.0
-    
-    for item in cart_items:
-        item_price = item.article.price * item.quantity
-        subtotal += item_price
-        
-        if item.article.discount_percentage > 0:
-            discount = item_price * (item.article.discount_percentage / 100)
-            total_discount += discount
-    
-    total = subtotal - total_discount
+    result = await db.execute(
+        select(CartItem)
+        .options(joinedload(CartItem.article))
+        .where(CartItem.user_id == current_user.id)
+    )
+    cart_items = result.scalars().all()
     
-    return {
-        "total_items": total_items,
-        "subtotal": subtotal,
-        "total_discount": total_discount,
-        "total": total,
-        "items": cart_items
-    }
+    totals = await get_cart_totals(db, current_user.id)
+    return {**totals, "items": cart_items}
+
+
+@app.get("/cart/summary", response_model=CartTotalsResponse)
+async def get_cart_summary(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get cart totals only (a single-row lookup, whatever the cart size)"""
+    return await get_cart_totals(db, current_user.id)
+
+
+async def commit_cart_changes(db: AsyncSession):
+    """Commit, turning a clash with another line's size and color into a 409"""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Cart already has a line for this article, size and color")
 
 
 @app.post("/cart", response_model=CartItemResponse)
-def add_to_cart(
+async def add_to_cart(
     item_data: CartItemCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Add item to cart"""
-    # Check if article exists
-    article = db.query(Article).filter(Article.id == item_data.article_id).first()
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
-    
-    # Check if item already in cart
-    existing_item = db.query(CartItem).filter(
-        CartItem.user_id == current_user.id,
-        CartItem.article_id == item_data.article_id,
-        CartItem.size == item_data.size,
-        CartItem.color == item_data.color
-    ).first()
-    
-    if existing_item:
-        # Update quantity
-        existing_item.quantity += item_data.quantity
-        db.commit()
-        db.refresh(existing_item)
-        return existing_item
-    
-    # Create new cart item
-    cart_item = CartItem(
+    """Add item to cart, or raise the quantity of the matching line"""
+    # A single upsert whether or not the line exists; the article foreign
+    # key doubles as the existence check
+    insert_stmt = sqlite_insert(CartItem).values(
         user_id=current_user.id,
         article_id=item_data.article_id,
         quantity=item_data.quantity,
         size=item_data.size,
         color=item_data.color
     )
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=CART_LINE_KEY,
+        set_={
+            "quantity": CartItem.quantity + insert_stmt.excluded.quantity,
+            "updated_at": datetime.utcnow()
+        }
+    ).returning(CartItem)
+    try:
+        result = await db.scalars(stmt, execution_options={"populate_existing": True})
+        cart_item = result.one()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Article not found")
     
-    db.add(cart_item)
-    db.commit()
-    db.refresh(cart_item)
+    article = await db.get(Article, item_data.article_id)
+    await apply_cart_delta(db, current_user.id, article, item_data.quantity)
+    await db.commit()
     
+    set_committed_value(cart_item, "article", article)
     return cart_item
 
 
+@app.post("/cart/batch", response_model=CartBatchResponse)
+async def batch_update_cart(
+    batch: CartBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply a list of add/update/remove operations in a single transaction"""
+    operations = batch.operations
+    
+    # All referenced articles in one query, the whole cart in another
+    article_ids = {op.article_id for op in operations if op.op == "add" and op.article_id is not None}
+    articles = {}
+    if article_ids:
+        result = await db.execute(select(Article).where(Article.id.in_(article_ids)))
+        articles = {article.id: article for article in result.scalars()}
+    
+    result = await db.execute(
+        select(CartItem)
+        .options(joinedload(CartItem.article))
+        .where(CartItem.user_id == current_user.id)
+    )
+    items_by_id = {item.id: item for item in result.scalars()}
+    items_by_key = {cart_line_key(item.article_id, item.size, item.color): item for item in items_by_id.values()}
+    new_items = []
+    
+    errors = []
+    deltas = []  # (article, quantity change) for the cart totals
+    
+    for index, op in enumerate(operations):
+        if op.op == "add":
+            if op.article_id is None:
+                errors.append({"index": index, "detail": "article_id is required"})
+                continue
+            article = articles.get(op.article_id)
+            if article is None:
+                errors.append({"index": index, "detail": "Article not found"})
+                continue
+            quantity = 1 if op.quantity is None else op.quantity
+            if quantity <= 0:
+                errors.append({"index": index, "detail": "Quantity must be positive"})
+                continue
+            
+            key = cart_line_key(op.article_id, op.size, op.color)
+            existing_item = items_by_key.get(key)
+            if existing_item:
+                existing_item.quantity += quantity
+            else:
+                cart_item = CartItem(
+                    user_id=current_user.id,
+                    article_id=op.article_id,
+                    quantity=quantity,
+                    size=op.size,
+                    color=op.color,
+                    article=article
+                )
+                db.add(cart_item)
+                items_by_key[key] = cart_item
+                new_items.append(cart_item)
+            deltas.append((article, quantity))
+            continue
+        
+        cart_item = items_by_id.get(op.cart_item_id)
+        if cart_item is None:
+            errors.append({"index": index, "detail": "Cart item not found"})
+            continue
+        
+        if op.op == "remove" or (op.quantity is not None and op.quantity <= 0):
+            deltas.append((cart_item.article, -cart_item.quantity))
+            del items_by_id[cart_item.id]
+            items_by_key.pop(cart_line_key(cart_item.article_id, cart_item.size, cart_item.color), None)
+            await db.delete(cart_item)
+            # The unit of work runs INSERTs and UPDATEs before DELETEs: send the
+            # delete now, so a later op can reuse this line's unique key
+            await db.flush()
+            continue
+        
+        # The whole cart is loaded, so a size/color change that would collide
+        # with another line is caught here, as this op's error, rather than by
+        # the unique index at commit, which would fail the whole batch
+        old_key = cart_line_key(cart_item.article_id, cart_item.size, cart_item.color)
+        new_key = cart_line_key(
+            cart_item.article_id,
+            cart_item.size if op.size is None else op.size,
+            cart_item.color if op.color is None else op.color,
+        )
+        if new_key != old_key and new_key in items_by_key:
+            errors.append({"index": index, "detail": "Another cart line already has this size and color"})
+            continue
+        
+        if op.quantity is not None:
+            deltas.append((cart_item.article, op.quantity - cart_item.quantity))
+            cart_item.quantity = op.quantity
+        if op.size is not None or op.color is not None:
+            del items_by_key[old_key]
+            if op.size is not None:
+                cart_item.size = op.size
+            if op.color is not None:
+                cart_item.color = op.color
+            items_by_key[new_key] = cart_item
+    
+    if deltas:
+        amounts = [line_amounts(article, quantity) for article, quantity in deltas]
+        await apply_totals_delta(
+            db,
+            current_user.id,
+            sum(quantity for _, quantity in deltas),
+            sum(amount for amount, _ in amounts),
+            sum(discount for _, discount in amounts),
+        )
+    await commit_cart_changes(db)
+    
+    items = sorted(list(items_by_id.values()) + new_items, key=lambda item: item.id)
+    totals = await get_cart_totals(db, current_user.id)
+    return {"cart": {**totals, "items": items}, "errors": errors}
+
+
 @app.put("/cart/{cart_item_id}", response_model=CartItemResponse)
-def update_cart_item(
+async def update_cart_item(
     cart_item_id: int,
     item_update: CartItemUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update cart item quantity or details"""
-    cart_item = db.query(CartItem).filter(
-        CartItem.id == cart_item_id,
-        CartItem.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(CartItem)
+        .options(joinedload(CartItem.article))
+        .where(CartItem.id == cart_item_id, CartItem.user_id == current_user.id)
+    )
+    cart_item = result.scalars().first()
     
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
     
     if item_update.quantity is not None:
         if item_update.quantity <= 0:
-            db.delete(cart_item)
-            db.commit()
+            await apply_cart_delta(db, current_user.id, cart_item.article, -cart_item.quantity)
+            await db.delete(cart_item)
+            await db.commit()
             return {"message": "Item removed from cart"}
+        await apply_cart_delta(db, current_user.id, cart_item.article, item_update.quantity - cart_item.quantity)
         cart_item.quantity = item_update.quantity
     
     if item_update.size is not None:
@@ -328,41 +727,44 @@ def update_cart_item(
     if item_update.color is not None:
         cart_item.color = item_update.color
     
-    db.commit()
-    db.refresh(cart_item)
+    await commit_cart_changes(db)
     
     return cart_item
 
 
 @app.delete("/cart/{cart_item_id}")
-def remove_from_cart(
+async def remove_from_cart(
     cart_item_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove item from cart"""
-    cart_item = db.query(CartItem).filter(
-        CartItem.id == cart_item_id,
-        CartItem.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(CartItem)
+        .options(joinedload(CartItem.article))
+        .where(CartItem.id == cart_item_id, CartItem.user_id == current_user.id)
+    )
+    cart_item = result.scalars().first()
     
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
     
-    db.delete(cart_item)
-    db.commit()
+    await apply_cart_delta(db, current_user.id, cart_item.article, -cart_item.quantity)
+    await db.delete(cart_item)
+    await db.commit()
     
     return {"message": "Item removed from cart"}
 
 
 @app.delete("/cart")
-def clear_cart(
+async def clear_cart(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Clear entire cart"""
-    db.query(CartItem).filter(CartItem.user_id == current_user.id).delete()
-    db.commit()
+    await db.execute(delete(CartItem).where(CartItem.user_id == current_user.id))
+    await reset_cart_totals(db, current_user.id)
+    await db.commit()
     
     return {"message": "Cart cleared"}
 
@@ -372,85 +774,307 @@ def clear_cart(
 # ============================================
 
 @app.get("/wishlist", response_model=List[WishlistItemResponse])
-def get_wishlist(
+async def get_wishlist(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's wishlist"""
-    wishlist_items = db.query(WishlistItem).filter(
-        WishlistItem.user_id == current_user.id
-    ).all()
+    result = await db.execute(
+        select(WishlistItem)
+        .options(joinedload(WishlistItem.article))
+        .where(WishlistItem.user_id == current_user.id)
+    )
+    wishlist_items = result.scalars().all()
     
     return wishlist_items
 
 
 @app.post("/wishlist", response_model=WishlistItemResponse)
-def add_to_wishlist(
+async def add_to_wishlist(
     item_data: WishlistItemCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add item to wishlist"""
-    # Check if article exists
-    article = db.query(Article).filter(Article.id == item_data.article_id).first()
-    if not article:
+    # Insert unless already there, in one statement; the article foreign
+    # key doubles as the existence check
+    stmt = (
+        sqlite_insert(WishlistItem)
+        .values(user_id=current_user.id, article_id=item_data.article_id)
+        .on_conflict_do_nothing(index_elements=[WishlistItem.user_id, WishlistItem.article_id])
+        .returning(WishlistItem)
+    )
+    try:
+        wishlist_item = (await db.scalars(stmt)).first()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Article not found")
     
-    # Check if already in wishlist
-    existing_item = db.query(WishlistItem).filter(
-        WishlistItem.user_id == current_user.id,
-        WishlistItem.article_id == item_data.article_id
-    ).first()
-    
-    if existing_item:
+    if wishlist_item is None:
         raise HTTPException(status_code=400, detail="Item already in wishlist")
     
-    # Create wishlist item
-    wishlist_item = WishlistItem(
-        user_id=current_user.id,
-        article_id=item_data.article_id
-    )
-    
-    db.add(wishlist_item)
-    db.commit()
-    db.refresh(wishlist_item)
+    article = await db.get(Article, item_data.article_id)
+    await db.commit()
     
+    set_committed_value(wishlist_item, "article", article)
     return wishlist_item
 
 
 @app.delete("/wishlist/{article_id}")
-def remove_from_wishlist(
+async def remove_from_wishlist(
     article_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove item from wishlist"""
-    wishlist_item = db.query(WishlistItem).filter(
+    result = await db.execute(select(WishlistItem).where(
         WishlistItem.user_id == current_user.id,
         WishlistItem.article_id == article_id
-    ).first()
+    ))
+    wishlist_item = result.scalars().first()
     
     if not wishlist_item:
         raise HTTPException(status_code=404, detail="Item not in wishlist")
     
-    db.delete(wishlist_item)
-    db.commit()
+    await db.delete(wishlist_item)
+    await db.commit()
     
     return {"message": "Item removed from wishlist"}
 
 
 @app.delete("/wishlist")
-def clear_wishlist(
+async def clear_wishlist(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Clear entire wishlist"""
-    db.query(WishlistItem).filter(WishlistItem.user_id == current_user.id).delete()
-    db.commit()
+    await db.execute(delete(WishlistItem).where(WishlistItem.user_id == current_user.id))
+    await db.commit()
     
     return {"message": "Wishlist cleared"}
 
 
+# ============================================
+# ORDER ENDPOINTS
+# ============================================
+
+def order_response(order: Order, items) -> dict:
+    response = {column.key: getattr(order, column.key) for column in Order.__table__.columns}
+    response["items"] = [dict(item._mapping) for item in items]
+    return response
+
+
+async def load_order_items(db: AsyncSession, order_ids: List[int]) -> dict:
+    """Line items for a page of orders in one query, grouped by order id"""
+    items = {order_id: [] for order_id in order_ids}
+    if order_ids:
+        result = await db.execute(
+            select(order_items)
+            .where(order_items.c.order_id.in_(order_ids))
+            .order_by(order_items.c.order_id, order_items.c.id)
+        )
+        for item in result:
+            items[item.order_id].append(item)
+    return items
+
+
+@app.post("/orders", response_model=OrderResponse)
+async def place_order(
+    order_data: OrderCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Turn the cart into an order: stock, order lines and cart change in one transaction"""
+    result = await db.execute(
+        select(CartItem)
+        .options(joinedload(CartItem.article))
+        .where(CartItem.user_id == current_user.id)
+    )
+    cart_items = result.scalars().all()
+    
+    if not cart_items:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+    
+    # Same article in several sizes/colors is decremented once, in id order
+    # so concurrent checkouts always take row locks in the same sequence
+    quantities = {}
+    for item in cart_items:
+        quantities[item.article_id] = quantities.get(item.article_id, 0) + item.quantity
+    
+    now = datetime.utcnow()
+    try:
+        for article_id, quantity in sorted(quantities.items()):
+            # Check and decrement in one conditional UPDATE: no read-modify-write
+            # window, so concurrent checkouts can never oversell
+            result = await db.execute(
+                update(Article)
+                .where(
+                    Article.id == article_id,
+                    Article.is_active == True,
+                    Article.stock_quantity >= quantity
+                )
+                .values(stock_quantity=Article.stock_quantity - quantity, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Not enough stock for article {article_id}"
+                )
+        
+        lines = []
+        total_amount = 0.0
+        for item in cart_items:
+            amount, discount = line_amounts(item.article, item.quantity)
+            total_amount += amount - discount
+            lines.append({
+                "article_id": item.article_id,
+                "quantity": item.quantity,
+                "price_at_purchase": (amount - discount) / item.quantity,
+                "size": item.size,
+                "color": item.color,
+            })
+        
+        order = Order(
+            user_id=current_user.id,
+            total_amount=total_amount,
+            shipping_address=order_data.shipping_address,
+            shipping_city=order_data.shipping_city,
+            shipping_postal_code=order_data.shipping_postal_code,
+            shipping_country=order_data.shipping_country,
+            payment_method=order_data.payment_method
+        )
+        db.add(order)
+        await db.flush()
+        
+        await db.execute(insert(order_items), [dict(line, order_id=order.id) for line in lines])
+        await db.execute(delete(CartItem).where(CartItem.user_id == current_user.id))
+        await reset_cart_totals(db, current_user.id)
+        await db.commit()
+    except OperationalError:
+        # SQLite gave up waiting for the write lock; nothing was applied
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Checkout is busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+    
+    # Stock changed through Core UPDATEs, which mapper events do not see
+    for article_id in quantities:
+        invalidate_article(article_id)
+    
+    result = await db.execute(
+        select(order_items).where(order_items.c.order_id == order.id).order_by(order_items.c.id)
+    )
+    return order_response(order, result.all())
+
+
+
+@app.get("/orders", response_model=List[OrderResponse])
+async def get_orders(
+    response: Response,
+    order_status: Optional[str] = Query(None, alias="status"),
+    user_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get order history, newest first; admins can list every user's orders"""
+    stmt = select(Order)
+    
+    if not current_user.is_admin:
+        stmt = stmt.where(Order.user_id == current_user.id)
+    elif user_id is not None:
+        stmt = stmt.where(Order.user_id == user_id)
+    
+    if order_status:
+        stmt = stmt.where(Order.status == order_status)
+    
+    # Served by ix_orders_(user_)(status_)created: an index seek per page
+    orders = await paginate(
+        db, stmt, (Order.created_at, Order.id), response,
+        cursor=cursor, limit=limit, descending=True
+    )
+    items = await load_order_items(db, [order.id for order in orders])
+    return [order_response(order, items[order.id]) for order in orders]
+
+
+@app.get("/orders/{order_id}", response_model=OrderResponse)
+async def get_order(
+    order_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a single order with its items"""
+    order = await db.get(Order, order_id)
+    if not order or (order.user_id != current_user.id and not current_user.is_admin):
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    items = await load_order_items(db, [order.id])
+    return order_response(order, items[order.id])
+
+# ============================================
+# WORKER LIFECYCLE AND READINESS
+# ============================================
+
+# Flipped once the worker is warm, and back when it is told to stop
+readiness = {"ready": False, "draining": False}
+warm_up_task: Optional[asyncio.Task] = None
+
+async def warm_catalog_cache():
+    """Fill the catalog cache with the first page of the hottest listings"""
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+    async with AsyncReadSessionLocal() as db:
+        await get_categories(request, Response(), skip=0, limit=100, cursor=None, db=db)
+        await get_featured_articles(request, Response(), skip=0, limit=20, cursor=None, fields=None, db=db)
+        await get_sale_articles(request, Response(), skip=0, limit=50, cursor=None, fields=None, db=db)
+        await catalog_snapshot.get(db)
+
+async def warm_up():
+    await prime_pools()
+    # Record the catalog version before loading anything, so changes made
+    # by other workers during warm-up are invalidated by the first poll
+    async with AsyncReadSessionLocal() as db:
+        await catalog_watcher.sync(db)
+    await warm_catalog_cache()
+    catalog_watcher.start(AsyncReadSessionLocal)
+    if not readiness["draining"]:
+        readiness["ready"] = True
+
+# Warm up in the background: the server only starts accepting once startup
+# hooks return, and /ready must be reachable (as "starting") meanwhile
+@app.on_event("startup")
+async def start_warm_up():
+    global warm_up_task
+    warm_up_task = asyncio.create_task(warm_up())
+
+def start_draining():
+    """
+    Report "draining" at /ready while requests are still served, so the
+    load balancer stops routing here before the worker stops listening.
+    Called on SIGTERM by the worker class in serve.py.
+    """
+    readiness["ready"] = False
+    readiness["draining"] = True
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    start_draining()
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+    await catalog_watcher.stop()
+
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    """200 once this worker is warm; 503 while starting or draining, so it gets no traffic"""
+    if not readiness["ready"]:
+        state = "draining" if readiness["draining"] else "starting"
+        return Response(content=dump_rows({"status": state}), status_code=503, media_type="application/json")
+    return {"status": "ready", "catalog_version": catalog_watcher.version}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
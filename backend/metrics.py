@@ -0,0 +1,265 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# ============================================
+# REQUEST METRICS
+# ============================================
+#
+# Counters are plain ints updated without locks: requests, their SQLAlchemy
+# cursor events and pool checkouts all run on the event loop thread (the
+# async engines execute inside greenlets spawned from it), so updates never
+# interleave. Each request allocates one RequestContext; everything else
+# is preallocated per route.
+
+# Upper bounds in seconds, shared by every latency histogram
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Requests that matched no route share one label, so unknown paths cannot
+# grow the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        buckets, total = [], 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return buckets
+
+
+class RouteStats:
+    """Totals for one (method, route template)"""
+    __slots__ = ("latency", "statuses", "queries", "db_seconds", "pool_wait_seconds")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses: Dict[int, int] = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+class RequestContext:
+    """DB cost of the request being handled, filled in by the engine and pool hooks"""
+    __slots__ = ("scope", "queries", "db_seconds", "pool_wait_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        """Route template, once the router has matched one"""
+        return getattr(self.scope.get("route"), "path", UNMATCHED_ROUTE)
+
+
+current_request: ContextVar[Optional[RequestContext]] = ContextVar("current_request", default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.in_flight = 0
+        self.pool_waits: Dict[str, Histogram] = {}
+        self.queries: Dict[str, int] = {}
+        self.db_seconds: Dict[str, float] = {}
+        # Callables returning extra gauge/counter families, see register_collector()
+        self.collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    def route(self, method: str, path: str) -> RouteStats:
+        key = (method, path)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        return stats
+
+    def pool_wait(self, pool: str) -> Histogram:
+        histogram = self.pool_waits.get(pool)
+        if histogram is None:
+            histogram = self.pool_waits[pool] = Histogram()
+        return histogram
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]):
+        """
+        Add metrics computed at scrape time. `collector` yields
+        (name, type, help, [(labels dict, value), ...]) families.
+        """
+        self.collectors.append(collector)
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: latency, status and DB cost per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        context = RequestContext(scope)
+        token = current_request.set(context)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            current_request.reset(token)
+            stats = metrics.route(scope["method"], context.route)
+            stats.latency.observe(time.perf_counter() - started)
+            stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+            stats.queries += context.queries
+            stats.db_seconds += context.db_seconds
+            stats.pool_wait_seconds += context.pool_wait_seconds
+
+
+# ============================================
+# DATABASE HOOKS
+# ============================================
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def instrument_engine(engine, name: str):
+    """Attribute query count and DB time on `engine` (sync or async) to the current request"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics.queries.setdefault(name, 0)
+    metrics.db_seconds.setdefault(name, 0.0)
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        metrics.queries[name] += 1
+        metrics.db_seconds[name] += elapsed
+        request = current_request.get()
+        if request is not None:
+            request.queries += 1
+            request.db_seconds += elapsed
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def timed_pool(name: str, base=AsyncAdaptedQueuePool):
+    """
+    `base` pool class that also records how long each checkout waited
+    for a connection. Pass it as create_async_engine(poolclass=...); the
+    class itself carries the name, so it survives pool recreation.
+    """
+    histogram = metrics.pool_wait(name)
+
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                waited = time.perf_counter() - started
+                histogram.observe(waited)
+                request = current_request.get()
+                if request is not None:
+                    request.pool_wait_seconds += waited
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+# ============================================
+# PROMETHEUS EXPOSITION
+# ============================================
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _family(lines: list, name: str, kind: str, help_text: str, samples: Iterable[tuple]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {value}")
+
+
+def _histogram(lines: list, name: str, help_text: str, series: Iterable[Tuple[dict, Histogram]]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in series:
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(dict(labels, le=bound))} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+def render_metrics() -> bytes:
+    """Every metric in the Prometheus text exposition format"""
+    routes = sorted(metrics.routes.items())
+    route_labels = [({"method": method, "route": path}, stats) for (method, path), stats in routes]
+    lines: List[str] = []
+
+    _histogram(lines, "maboutique_http_request_duration_seconds", "Request latency by route",
+               ((labels, stats.latency) for labels, stats in route_labels))
+    _family(lines, "maboutique_http_requests_total", "counter", "Requests by route and status", (
+        (dict(labels, status=code), count)
+        for labels, stats in route_labels for code, count in sorted(stats.statuses.items())
+    ))
+    _family(lines, "maboutique_http_requests_in_flight", "gauge", "Requests being handled",
+            [({}, metrics.in_flight)])
+    _family(lines, "maboutique_http_db_queries_total", "counter", "SQL statements run by requests to a route",
+            ((labels, stats.queries) for labels, stats in route_labels))
+    _family(lines, "maboutique_http_db_seconds_total", "counter", "Time spent in SQL statements by route",
+            ((labels, stats.db_seconds) for labels, stats in route_labels))
+    _family(lines, "maboutique_http_db_pool_wait_seconds_total", "counter",
+            "Time spent waiting for a pooled connection by route",
+            ((labels, stats.pool_wait_seconds) for labels, stats in route_labels))
+
+    _family(lines, "maboutique_db_queries_total", "counter", "SQL statements by engine",
+            (({"engine": name}, count) for name, count in sorted(metrics.queries.items())))
+    _family(lines, "maboutique_db_seconds_total", "counter", "Time spent in SQL statements by engine",
+            (({"engine": name}, seconds) for name, seconds in sorted(metrics.db_seconds.items())))
+    _histogram(lines, "maboutique_db_pool_wait_seconds", "Connection pool checkout wait",
+               (({"pool": name}, histogram) for name, histogram in sorted(metrics.pool_waits.items())))
+
+    for collector in metrics.collectors:
+        for name, kind, help_text, samples in collector():
+            _family(lines, name, kind, help_text, samples)
+    return ("\n".join(lines) + "\n").encode()
@@ -0,0 +1,204 @@
+"""
+Versioned schema migrations for MaBoutique
+
+Run once per deploy, before starting the workers:
+
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied and pending ones
+
+Applied versions are recorded in `schema_migrations`. Workers only check
+at startup that the database is not behind (one indexed query); they
+never create or alter anything themselves.
+
+Migration 1 creates the tables of the current models on a new database,
+so every later step must also be a no-op where its change already
+exists. The same holds for databases set up before this table existed:
+all steps run once against them, and only add what is missing.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select
+from models import Base
+from search import create_search_index
+from catalog_sync import create_change_log, create_user_change_counter
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+# ============================================
+# STEPS
+# ============================================
+
+def index_names(engine) -> set:
+    """
+    Every index in the database. Not from inspect(): SQLite reflection
+    skips expression indexes such as uq_cart_items_line.
+    """
+    with engine.connect() as conn:
+        return set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+
+
+def create_schema(engine):
+    Base.metadata.create_all(bind=engine)
+
+
+def add_missing_columns(engine):
+    """create_all() does not alter existing tables: add nullable columns declared since"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+
+
+def merge_duplicate_lines(engine):
+    """
+    Before the unique line indexes existed, concurrent adds could store the
+    same cart or wishlist line twice. Fold those into the oldest row so the
+    indexes can be built.
+    """
+    if {"uq_cart_items_line", "uq_wishlist_items_user_article"} <= index_names(engine):
+        return
+
+    line_key = "user_id, article_id, coalesce(size, ''), coalesce(color, '')"
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"""
+            UPDATE cart_items SET quantity = (
+                SELECT sum(line.quantity) FROM cart_items AS line
+                WHERE line.user_id = cart_items.user_id
+                  AND line.article_id = cart_items.article_id
+                  AND coalesce(line.size, '') = coalesce(cart_items.size, '')
+                  AND coalesce(line.color, '') = coalesce(cart_items.color, '')
+            )
+            WHERE id IN (SELECT min(id) FROM cart_items GROUP BY {line_key} HAVING count(*) > 1)
+        """)
+        conn.exec_driver_sql(
+            f"DELETE FROM cart_items WHERE id NOT IN (SELECT min(id) FROM cart_items GROUP BY {line_key})"
+        )
+        conn.exec_driver_sql(
+            "DELETE FROM wishlist_items WHERE id NOT IN "
+            "(SELECT min(id) FROM wishlist_items GROUP BY user_id, article_id)"
+        )
+        # Superseded by the unique indexes, which serve the same lookups
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_cart_items_user_article")
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_wishlist_items_user_article")
+
+
+def create_indexes(engine):
+    """
+    Build every index declared in models.py that is missing, each in its own
+    transaction: SQLite blocks writers while one index builds (readers carry
+    on under WAL), so the lock is released between indexes rather than held
+    for all of them.
+    """
+    existing = index_names(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in existing:
+                with engine.begin() as conn:
+                    index.create(bind=conn)
+
+
+def analyze(engine):
+    """Planner statistics, so the partial and composite indexes get picked"""
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+# Append only: never renumber, edit or remove an applied step
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create_schema", create_schema),
+    Migration(2, "add_missing_columns", add_missing_columns),
+    Migration(3, "merge_duplicate_lines", merge_duplicate_lines),
+    Migration(4, "create_indexes", create_indexes),
+    Migration(5, "article_search_index", create_search_index),
+    Migration(6, "catalog_change_log", create_change_log),
+    Migration(7, "analyze", analyze),
+    Migration(8, "user_change_counter", create_user_change_counter),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ============================================
+# RUNNER
+# ============================================
+
+def applied_versions(engine) -> set:
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations.name):
+            return set()
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def migrate(engine, log=lambda message: None) -> List[Migration]:
+    """Apply pending migrations in order and return them"""
+    schema_migrations.create(bind=engine, checkfirst=True)
+    done = applied_versions(engine)
+    pending = [migration for migration in MIGRATIONS if migration.version not in done]
+    for migration in pending:
+        start = time.perf_counter()
+        migration.apply(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(schema_migrations).values(
+                version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+            ))
+        log(f"✅ {migration.version:>3} {migration.name} ({time.perf_counter() - start:.2f}s)")
+    return pending
+
+
+def check_schema(engine):
+    """Fail fast when the database is behind this code; newer databases are fine"""
+    done = applied_versions(engine)
+    missing = [migration for migration in MIGRATIONS if migration.version not in done]
+    if missing:
+        names = ", ".join(f"{migration.version} {migration.name}" for migration in missing)
+        raise SchemaOutOfDate(f"database is missing migrations {names}: run `python migrations.py`")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    args = parser.parse_args()
+
+    from database import engine
+
+    if args.status:
+        done = applied_versions(engine)
+        for migration in MIGRATIONS:
+            print(f"{'applied' if migration.version in done else 'pending':<9}{migration.version:>3} {migration.name}")
+        return
+
+    start = time.perf_counter()
+    applied = migrate(engine, log=print)
+    if not applied:
+        print(f"✅ Database already at version {LATEST_VERSION}")
+        return
+    print(f"🎉 Applied {len(applied)} migration(s) in {time.perf_counter() - start:.1f}s, now at version {LATEST_VERSION}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
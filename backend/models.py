@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Text, Table
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Text, JSON, Table, Index, event, func, inspect, literal_column, select, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, object_session, relationship
 from datetime import datetime
+from cache import invalidate_article, invalidate_category, invalidate_user
 
 Base = declarative_base()
 
@@ -10,7 +11,7 @@ order_items = Table(
     'order_items',
     Base.metadata,
     Column('id', Integer, primary_key=True),
-    Column('order_id', Integer, ForeignKey('orders.id')),
+    Column('order_id', Integer, ForeignKey('orders.id'), index=True),  # line items of an order page
     Column('article_id', Integer, ForeignKey('articles.id')),
     Column('quantity', Integer, default=1),
     Column('price_at_purchase', Float),  # Store price at time of purchase
@@ -50,6 +51,10 @@ class Category(Base):
     
     # Relationships
     articles = relationship("Article", back_populates="category")
+    
+    __table_args__ = (
+        Index("ix_categories_active", "id", sqlite_where=text("is_active = 1")),
+    )
 
 
 class Article(Base):
@@ -62,8 +67,13 @@ class Article(Base):
     brand = Column(String(100), nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     
+    # Supplier reference: the natural key catalog imports upsert on
+    sku = Column(String(64), nullable=True)
+    
     # Product details
     image_url = Column(String(500), nullable=True)
+    sizes = Column(JSON, nullable=True)  # ["S", "M", "L"]
+    colors = Column(JSON, nullable=True)  # ["Black", "Navy"]
     stock_quantity = Column(Integer, default=0)
     is_featured = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
@@ -81,6 +91,16 @@ class Article(Base):
     category = relationship("Category", back_populates="articles")
     wishlist_items = relationship("WishlistItem", back_populates="article")
     cart_items = relationship("CartItem", back_populates="article")
+    
+    # Partial indexes for the catalog listings, all paged by id. Their WHERE
+    # clauses must match the endpoint filters literally (no bound parameters)
+    # for SQLite to use them.
+    __table_args__ = (
+        Index("uq_articles_sku", "sku", unique=True),
+        Index("ix_articles_active_category", "category_id", "id", sqlite_where=text("is_active = 1")),
+        Index("ix_articles_featured", "id", sqlite_where=text("is_featured = 1 AND is_active = 1")),
+        Index("ix_articles_on_sale", "id", sqlite_where=text("discount_percentage > 0 AND is_active = 1")),
+    )
 
 
 class Order(Base):
@@ -111,6 +131,14 @@ class Order(Base):
     
     # Relationships
     user = relationship("User", back_populates="orders")
+    
+    # Order history is read newest first, per user and optionally per status
+    __table_args__ = (
+        Index("ix_orders_user_created", "user_id", "created_at", "id"),
+        Index("ix_orders_user_status_created", "user_id", "status", "created_at", "id"),
+        Index("ix_orders_status_created", "status", "created_at", "id"),
+        Index("ix_orders_created", "created_at", "id"),
+    )
 
 
 class WishlistItem(Base):
@@ -124,6 +152,11 @@ class WishlistItem(Base):
     # Relationships
     user = relationship("User", back_populates="wishlist_items")
     article = relationship("Article", back_populates="wishlist_items")
+    
+    # One row per article per user; add_to_wishlist upserts against it
+    __table_args__ = (
+        Index("uq_wishlist_items_user_article", "user_id", "article_id", unique=True),
+    )
 
 
 class CartItem(Base):
@@ -140,4 +173,107 @@ class CartItem(Base):
     
     # Relationships
     user = relationship("User", back_populates="cart_items")
-    article = relationship("Article", back_populates="cart_items")
\ No newline at end of file
+    article = relationship("Article", back_populates="cart_items")
+    
+
+
+# A cart line is one article in one size and color. NULLs never collide in
+# a unique index, so the key compares a missing size or color as ''. The
+# index also serves the per-user cart read through its user_id prefix.
+CART_LINE_KEY = (
+    CartItem.user_id,
+    CartItem.article_id,
+    func.coalesce(CartItem.size, literal_column("''")),
+    func.coalesce(CartItem.color, literal_column("''")),
+)
+Index("uq_cart_items_line", *CART_LINE_KEY, unique=True)
+
+
+class CartTotals(Base):
+    """Running cart totals per user, kept up to date by every cart mutation"""
+    __tablename__ = "cart_totals"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_items = Column(Integer, default=0, nullable=False)
+    subtotal = Column(Float, default=0.0, nullable=False)
+    total_discount = Column(Float, default=0.0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CatalogVersion(Base):
+    """Single-row counter bumped by the catalog change triggers (catalog_sync.py)"""
+    __tablename__ = "catalog_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+
+class CatalogChange(Base):
+    """Latest catalog version at which each article or category changed"""
+    __tablename__ = "catalog_changes"
+    
+    entity = Column(String(20), primary_key=True)  # article, category
+    entity_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, index=True)
+
+# ============================================
+# CACHE INVALIDATION
+# ============================================
+
+# Flush events fire before the commit: dropping the cache there let a
+# concurrent reader refill it with the old row, which then outlived the
+# write. Stale keys are queued on the session instead, and dropped once
+# the transaction commits; a rollback leaves the cached rows valid.
+
+def _invalidate_on_commit(target, invalidate, key):
+    session = object_session(target)
+    if session is None:
+        invalidate(key)
+    else:
+        session.info.setdefault("stale_cache_keys", set()).add((invalidate, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale_cache_keys(session):
+    for invalidate, key in session.info.pop("stale_cache_keys", ()):
+        invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_cache_keys(session):
+    session.info.pop("stale_cache_keys", None)
+
+
+@event.listens_for(Article, "after_insert")
+@event.listens_for(Article, "after_update")
+@event.listens_for(Article, "after_delete")
+def _invalidate_cached_article(mapper, connection, target):
+    _invalidate_on_commit(target, invalidate_article, target.id)
+
+
+@event.listens_for(Category, "after_insert")
+@event.listens_for(Category, "after_update")
+@event.listens_for(Category, "after_delete")
+def _invalidate_cached_category(mapper, connection, target):
+    _invalidate_on_commit(target, invalidate_category, target.id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    # A renamed user must also drop the entry under the old username
+    for username in inspect(target).attrs.username.history.deleted or ():
+        _invalidate_on_commit(target, invalidate_user, username)
+    _invalidate_on_commit(target, invalidate_user, target.username)
+
+
+@event.listens_for(Article, "after_update")
+def _invalidate_cart_totals(mapper, connection, target):
+    # Totals of carts holding this article were computed with the old price;
+    # drop them so they are rebuilt from the cart on the next read
+    attrs = inspect(target).attrs
+    if attrs.price.history.has_changes() or attrs.discount_percentage.history.has_changes():
+        connection.execute(
+            CartTotals.__table__.delete().where(
+                CartTotals.user_id.in_(select(CartItem.user_id).where(CartItem.article_id == target.id))
+            )
+        )
@@ -0,0 +1,104 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# ============================================
+# KEYSET (CURSOR) PAGINATION
+# ============================================
+
+# Header carrying the cursor for the next page. List bodies stay plain JSON
+# arrays so existing clients keep working unchanged.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and set(value) == {"dt"}:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Pack the sort key of the last row into an opaque, URL-safe token"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Unpack a cursor produced by encode_cursor()"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = [_decode_value(v) for v in json.loads(base64.urlsafe_b64decode(padded.encode()))]
+    except (binascii.Error, ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def _seek_filter(keys: Sequence, values: Sequence, descending: bool = False):
+    """(k1, k2, ...) > (v1, v2, ...) spelled out so any index on the keys can serve it"""
+    clauses = []
+    for i, key in enumerate(keys):
+        equal_prefix = [keys[j] == values[j] for j in range(i)]
+        beyond = key < values[i] if descending else key > values[i]
+        clauses.append(and_(*equal_prefix, beyond))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False,
+):
+    """
+    Page through `stmt` ordered by `keys` (the last key must be unique).
+
+    With a cursor the page starts right after the row the cursor points to,
+    which the database reaches through an index seek instead of counting
+    past `skip` rows. Without one, classic skip/limit is used. Either way
+    the cursor for the following page is returned in X-Next-Cursor.
+    `descending` walks the keys from largest to smallest (newest first).
+
+    Returns the entities for a single-entity select (`select(Article)`),
+    or a dict per row when `stmt` selects several columns.
+    """
+    # Not selected_columns: that counts every column of an entity
+    described = stmt.column_descriptions
+    entity_select = len(described) == 1 and described[0]["expr"] is described[0]["entity"]
+    width = len(described)
+    labelled = [key.label(f"_page_key_{i}") for i, key in enumerate(keys)]
+    ordering = [key.desc() for key in keys] if descending else keys
+    stmt = stmt.add_columns(*labelled).order_by(None).order_by(*ordering)
+
+    if cursor:
+        stmt = stmt.where(_seek_filter(keys, decode_cursor(cursor, len(keys)), descending))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if has_more and rows:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][-len(keys):])
+    if entity_select:
+        return [row[0] for row in rows]
+    # A column select: plain dicts, without the page keys
+    names = list(stmt.selected_columns.keys())[:width]
+    return [dict(zip(names, row)) for row in rows]
@@ -1,23 +1,19 @@
 """
 Database Population Script for MaBoutique
 Populates 10 articles for each category: Clothes, Shoes, Accessories
+
+The sample articles go through the bulk catalog importer, so sizes and
+colors are kept and running the script again updates them in place.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime
 import random
+import re
 
-# Import your models (adjust the import path as needed)
-from models import Base, Article, Category  # Adjust based on your models.py structure
-
-# Database configuration
-DATABASE_URL = "sqlite:///maboutique.db"  # Adjust to your database URL
-
-# Create engine and session
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
+from sqlalchemy import insert, select
+from database import engine
+from migrations import migrate
+from import_catalog import CatalogImporter
+from models import Category
 
 # Sample data for articles
 CLOTHES_ARTICLES = [
@@ -301,86 +297,60 @@ ACCESSORIES_ARTICLES = [
 
 def create_categories():
     """Create the three main categories"""
-    categories = []
     category_names = ["Clothes", "Shoes", "Accessories"]
     
-    for name in category_names:
-        # Check if category already exists
-        existing = session.query(Category).filter_by(name=name).first()
-        if not existing:
-            category = Category(
-                name=name,
-                description=f"Browse our collection of {name.lower()}",
-                image_url=f"https://via.placeholder.com/400x300/3B82F6/FFFFFF?text={name}"
-            )
-            session.add(category)
-            categories.append(category)
-        else:
-            categories.append(existing)
-    
-    session.commit()
-    return categories
+    with engine.begin() as conn:
+        existing = set(conn.execute(select(Category.name)).scalars())
+        for name in category_names:
+            if name not in existing:
+                conn.execute(insert(Category).values(
+                    name=name,
+                    description=f"Browse our collection of {name.lower()}",
+                    image_url=f"https://via.placeholder.com/400x300/3B82F6/FFFFFF?text={name}"
+                ))
+    return category_names
 
-def create_articles(category, articles_data):
-    """Create articles for a given category"""
-    created_articles = []
-    
+def sample_records(category, articles_data):
+    """Feed records for a category's sample articles"""
     for data in articles_data:
-        article = Article(
-            name=data["name"],
-            description=data["description"],
-            price=data["price"],
-            image_url=data["image_url"],
-            brand=data["brand"],
-            category_id=category.id,
-            stock_quantity=random.randint(10, 100),
-            is_featured=random.choice([True, False]),
-            discount_percentage=random.choice([0, 10, 15, 20, 25]),
-            rating=round(random.uniform(3.5, 5.0), 1),
-            created_at=datetime.utcnow()
-        )
-        
-        session.add(article)
-        created_articles.append(article)
-    
-    session.commit()
-    return created_articles
+        yield {
+            **data,
+            "sku": f"{category[:3].upper()}-{re.sub(r'[^a-z0-9]+', '-', data['name'].lower()).strip('-')}",
+            "category": category,
+            "stock_quantity": random.randint(10, 100),
+            "is_featured": random.choice([True, False]),
+            "discount_percentage": random.choice([0, 10, 15, 20, 25]),
+            "rating": round(random.uniform(3.5, 5.0), 1),
+        }
 
 def populate_database():
     """Main function to populate the database"""
     print("🚀 Starting database population...")
     
-    # Create tables if they don't exist
-    Base.metadata.create_all(engine)
+    # Bring the schema up to date
+    migrate(engine)
     
     # Create categories
     print("\n📁 Creating categories...")
     categories = create_categories()
-    clothes_cat, shoes_cat, accessories_cat = categories
     print(f"✅ Created/Found {len(categories)} categories")
     
-    # Create articles for each category
-    print("\n👕 Creating Clothes articles...")
-    clothes_articles = create_articles(clothes_cat, CLOTHES_ARTICLES)
-    print(f"✅ Created {len(clothes_articles)} clothes articles")
-    
-    print("\n👟 Creating Shoes articles...")
-    shoes_articles = create_articles(shoes_cat, SHOES_ARTICLES)
-    print(f"✅ Created {len(shoes_articles)} shoes articles")
-    
-    print("\n🎒 Creating Accessories articles...")
-    accessories_articles = create_articles(accessories_cat, ACCESSORIES_ARTICLES)
-    print(f"✅ Created {len(accessories_articles)} accessories articles")
+    # The importer resolves the categories created above by name
+    importer = CatalogImporter(engine, log=lambda message: None)
+    for category, articles_data, icon in [
+        ("Clothes", CLOTHES_ARTICLES, "👕"),
+        ("Shoes", SHOES_ARTICLES, "👟"),
+        ("Accessories", ACCESSORIES_ARTICLES, "🎒"),
+    ]:
+        print(f"\n{icon} Creating {category} articles...")
+        stats = importer.import_records(sample_records(category, articles_data))
+        print(f"✅ Created/Updated {stats['imported']} {category.lower()} articles")
     
     print(f"\n🎉 Database population complete!")
-    print(f"📊 Total articles created: {len(clothes_articles) + len(shoes_articles) + len(accessories_articles)}")
-    
-    session.close()
+    print(f"📊 Total articles created/updated: {importer.imported}")
 
 if __name__ == "__main__":
     try:
         populate_database()
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
-        session.rollback()
-        session.close()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import contextlib
+from typing import List
+from sqlalchemy import event
+
+# ============================================
+# SQL STATEMENT COUNTER
+# ============================================
+
+
+class QueryCounter:
+    """Statements executed on an engine while the counter is active"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.parameters: List[object] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+
+@contextlib.contextmanager
+def count_queries(*engines):
+    """
+    Count SQL statements sent to the given engines (sync or async) inside the block.
+
+        with count_queries(async_engine) as counter:
+            ...
+        assert counter.count <= 2, counter.statements
+    """
+    sync_engines = [getattr(engine, "sync_engine", engine) for engine in engines]
+    counter = QueryCounter()
+    for sync_engine in sync_engines:
+        event.listen(sync_engine, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        for sync_engine in sync_engines:
+            event.remove(sync_engine, "before_cursor_execute", counter._record)
+
+
+def assert_max_queries(counter: QueryCounter, expected: int, label: str = ""):
+    if counter.count > expected:
+        executed = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(counter.statements))
+        raise AssertionError(
+            f"{label or 'block'} ran {counter.count} SQL statements, expected at most {expected}:\n{executed}"
+        )
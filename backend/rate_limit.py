@@ -0,0 +1,190 @@
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict
+from fastapi import HTTPException, Request, status
+from auth import verify_token
+
+# ============================================
+# ADMISSION CONTROL
+# ============================================
+#
+# Login, signup (bcrypt) and search cost far more than a catalog read.
+# Each of these route classes gets a token bucket per client, keyed by the
+# authenticated user when the request carries a valid token and by client
+# IP otherwise, plus a cap on requests in flight. Requests over either
+# limit are refused before any work is done: 429 when one client exceeds
+# its rate, 503 when the route class is at capacity, both with Retry-After.
+#
+# State is per worker process: with N workers, a client gets up to N times
+# the configured rate. RATE_LIMITING=off disables every check (benchmarks).
+
+RATE_LIMITING = os.getenv("RATE_LIMITING", "on") != "off"
+# Most clients seen at once per route class; the least recent are forgotten
+MAX_TRACKED_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`"""
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, rate: float, burst: float, now: float):
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    def take(self, rate: float, burst: float, now: float) -> float:
+        """Take a token and return 0, or return the seconds until one is available"""
+        self.refill(rate, burst, now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+
+class RateLimiter:
+    """Token buckets per key, for the MAX_TRACKED_CLIENTS most recent keys"""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.limited = 0
+
+    def retry_after(self, key: str) -> float:
+        """0 if `key` may proceed (and is charged a token), else seconds to wait"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.burst, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        wait = bucket.take(self.rate, self.burst, now)
+        if wait:
+            self.limited += 1
+        return wait
+
+    def wait(self, key: str) -> float:
+        """Like retry_after(), but without taking a token: 0 if `key` has one left"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0
+        bucket.refill(self.rate, self.burst, time.monotonic())
+        if bucket.tokens >= 1:
+            return 0.0
+        self.limited += 1
+        return (1 - bucket.tokens) / self.rate
+
+
+class RouteClass:
+    def __init__(self, name: str, rate: float, burst: float, max_concurrent: int):
+        self.name = name
+        self.limiter = RateLimiter(rate, burst)
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.shed = 0
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "rate_limited": self.limiter.limited,
+            "shed": self.shed,
+        }
+
+
+def _env(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+ROUTE_CLASSES: Dict[str, RouteClass] = {
+    # Per client: a few attempts a second, and a short burst for retries
+    "auth": RouteClass("auth", _env("AUTH_RATE_PER_SECOND", 1), _env("AUTH_BURST", 10),
+                       int(_env("AUTH_MAX_CONCURRENT", 64))),
+    "search": RouteClass("search", _env("SEARCH_RATE_PER_SECOND", 5), _env("SEARCH_BURST", 20),
+                         int(_env("SEARCH_MAX_CONCURRENT", 32))),
+}
+
+# Failed logins per (account, client IP). Only failures are charged and
+# only the failing client is refused, so nobody can lock a user out of
+# their account; guessing from many IPs is bounded by the "auth" class.
+login_attempts = RateLimiter(_env("LOGIN_ATTEMPTS_PER_MINUTE", 20) / 60, _env("LOGIN_ATTEMPTS_BURST", 10))
+
+
+def _too_many_requests(wait: float, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+    )
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def client_key(request: Request) -> str:
+    """The authenticated user if the request carries a valid token, else the client IP"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{verify_token(token)}"
+        except HTTPException:
+            pass
+    return f"ip:{client_ip(request)}"
+
+
+def admission(route_class: str):
+    """
+    Dependency limiting a route class, to list first in a route's
+    dependencies so that refused requests never open a DB session:
+
+        @app.get("/articles/search", dependencies=[Depends(admission("search"))])
+    """
+    limits = ROUTE_CLASSES[route_class]
+
+    async def admit(request: Request):
+        if not RATE_LIMITING:
+            yield
+            return
+        wait = limits.limiter.retry_after(client_key(request))
+        if wait:
+            raise _too_many_requests(wait, "Too many requests, slow down")
+        if limits.in_flight >= limits.max_concurrent:
+            limits.shed += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        limits.in_flight += 1
+        try:
+            yield
+        finally:
+            limits.in_flight -= 1
+
+    return admit
+
+
+def _login_key(username: str, request: Request) -> str:
+    return f"{username.lower()}|{client_ip(request)}"
+
+
+def check_login_attempts(username: str, request: Request):
+    """Refuse a client that used up its failed attempts on this account, before any bcrypt work"""
+    if RATE_LIMITING:
+        wait = login_attempts.wait(_login_key(username, request))
+        if wait:
+            raise _too_many_requests(wait, "Too many failed login attempts for this account, try again later")
+
+
+def record_failed_login(username: str, request: Request):
+    if RATE_LIMITING:
+        login_attempts.retry_after(_login_key(username, request))
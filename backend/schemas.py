@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
 # ============================================
 # USER SCHEMAS
@@ -70,6 +70,8 @@ class ArticleBase(BaseModel):
     brand: Optional[str] = None
     category_id: int
     image_url: Optional[str] = None
+    sizes: Optional[List[str]] = None
+    colors: Optional[List[str]] = None
     stock_quantity: int = 0
     is_featured: bool = False
     discount_percentage: float = 0.0
@@ -118,13 +120,37 @@ class CartItemResponse(BaseModel):
     class Config:
         from_attributes = True
 
-class CartSummary(BaseModel):
+class CartTotalsResponse(BaseModel):
     total_items: int
     subtotal: float
     total_discount: float
     total: float
+
+class CartSummary(CartTotalsResponse):
     items: list[CartItemResponse]
 
+class CartOperation(BaseModel):
+    # add: article_id (+ quantity, size, color), merged into a matching line
+    # update: cart_item_id + new quantity/size/color (quantity <= 0 removes)
+    # remove: cart_item_id
+    op: Literal["add", "update", "remove"]
+    article_id: Optional[int] = None
+    cart_item_id: Optional[int] = None
+    quantity: Optional[int] = None
+    size: Optional[str] = None
+    color: Optional[str] = None
+
+class CartBatchRequest(BaseModel):
+    operations: list[CartOperation] = Field(..., min_length=1, max_length=200)
+
+class CartOperationError(BaseModel):
+    index: int
+    detail: str
+
+class CartBatchResponse(BaseModel):
+    cart: CartSummary
+    errors: list[CartOperationError]
+
 
 # ============================================
 # WISHLIST SCHEMAS
@@ -141,4 +167,60 @@ class WishlistItemResponse(BaseModel):
     article: ArticleResponse
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# ============================================
+# ORDER SCHEMAS
+# ============================================
+
+class OrderCreate(BaseModel):
+    shipping_address: Optional[str] = None
+    shipping_city: Optional[str] = None
+    shipping_postal_code: Optional[str] = None
+    shipping_country: Optional[str] = None
+    payment_method: Optional[str] = None
+
+class OrderItemResponse(BaseModel):
+    id: int
+    article_id: int
+    quantity: int
+    price_at_purchase: float
+    size: Optional[str]
+    color: Optional[str]
+    
+    class Config:
+        from_attributes = True
+
+class OrderResponse(BaseModel):
+    id: int
+    user_id: int
+    total_amount: float
+    status: str
+    payment_status: str
+    shipping_address: Optional[str]
+    shipping_city: Optional[str]
+    shipping_postal_code: Optional[str]
+    shipping_country: Optional[str]
+    payment_method: Optional[str]
+    created_at: datetime
+    items: list[OrderItemResponse]
+    
+    class Config:
+        from_attributes = True
+
+
+# ============================================
+# CATALOG SYNC SCHEMAS
+# ============================================
+
+class CatalogSnapshotResponse(BaseModel):
+    version: int
+    categories: list[CategoryResponse]
+    articles: list[ArticleResponse]
+
+class CatalogChangesResponse(BaseModel):
+    version: int
+    categories: list[CategoryResponse]
+    removed_category_ids: list[int]
+    articles: list[ArticleResponse]
+    removed_article_ids: list[int]
@@ -0,0 +1,128 @@
+import re
+from typing import Optional, Sequence
+from sqlalchemy import DDL, ColumnElement, Select, column, false, func, literal_column, select, table, text
+from models import Article
+
+# ============================================
+# FULL-TEXT SEARCH INDEX (SQLite FTS5)
+# ============================================
+
+# External-content FTS5 table: the index stores only tokens, the text itself
+# stays in `articles`. Triggers keep it in sync with every write to articles,
+# whether it comes from the ORM, Core statements or a raw sqlite shell.
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        name, brand, description,
+        content='articles', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, name, brand, description)
+        VALUES (new.id, new.name, new.brand, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, name, brand, description)
+        VALUES ('delete', old.id, old.name, old.brand, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF name, brand, description ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, name, brand, description)
+        VALUES ('delete', old.id, old.name, old.brand, old.description);
+        INSERT INTO articles_fts(rowid, name, brand, description)
+        VALUES (new.id, new.name, new.brand, new.description);
+    END
+    """,
+]
+
+# Column weights for bm25(): a hit in the name matters more than in the brand,
+# which matters more than a hit somewhere in the description.
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+# bm25() is computed for every row it orders, before LIMIT: a common term
+# ("made", "cotton") matching most of the catalog cost 10-25x a LIKE scan.
+# Only the newest SEARCH_CANDIDATES matches are ranked, which FTS5 finds
+# walking its rowids backwards; a query matching fewer is ranked in full.
+# The price: results past that many matches are not searchable.
+SEARCH_CANDIDATES = 1000
+
+articles_fts = table("articles_fts", column("rowid"), column("articles_fts"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def create_search_index(engine):
+    """Create the FTS5 table and its sync triggers, backfilling existing rows"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        existed = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'")
+        ).first()
+        for statement in SEARCH_INDEX_DDL:
+            conn.execute(DDL(statement))
+        if not existed:
+            conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """Turn free user input into a safe FTS5 prefix query ("leath"* "jack"*)"""
+    terms = _TOKEN_RE.findall(q)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_articles_query(
+    dialect: str, q: str, category_id: Optional[int] = None, columns: Sequence = (Article,)
+) -> Select:
+    """Build the ranked article search statement for the given SQL dialect, selecting `columns`"""
+    if dialect != "sqlite":
+        return ilike_search_query(q, category_id, columns)
+
+    match = build_match_query(q)
+    stmt = select(*columns).select_from(Article).join(articles_fts, articles_fts.c.rowid == Article.id)
+    stmt = stmt.where(Article.is_active == True)
+    if match is None:
+        return stmt.where(false())
+
+    stmt = stmt.where(articles_fts.c.articles_fts.op("MATCH")(match))
+    if category_id:
+        stmt = stmt.where(Article.category_id == category_id)
+    stmt = stmt.where(articles_fts.c.rowid >= _oldest_candidate(match, category_id))
+    return stmt.order_by(*search_sort_keys(dialect))
+
+
+def _oldest_candidate(match: str, category_id: Optional[int]) -> ColumnElement:
+    """Lowest article id among the newest SEARCH_CANDIDATES matches, 0 when there are none"""
+    fts = articles_fts.alias("candidates_fts")
+    newest = (
+        select(fts.c.rowid).join(Article, Article.id == fts.c.rowid)
+        .where(fts.c.articles_fts.op("MATCH")(match), Article.is_active == True)
+    )
+    if category_id:
+        newest = newest.where(Article.category_id == category_id)
+    newest = newest.order_by(fts.c.rowid.desc()).limit(SEARCH_CANDIDATES).subquery()
+    return select(func.coalesce(func.min(newest.c.rowid), 0)).scalar_subquery()
+
+
+def search_sort_keys(dialect: str):
+    """Ordering of search results, best match first; Article.id breaks ties"""
+    if dialect != "sqlite":
+        return (Article.id,)
+    return (func.bm25(literal_column("articles_fts"), *BM25_WEIGHTS), Article.id)
+
+
+def ilike_search_query(q: str, category_id: Optional[int] = None, columns: Sequence = (Article,)) -> Select:
+    """Unindexed substring search, used on databases without FTS5"""
+    stmt = select(*columns).where(Article.is_active == True)
+    stmt = stmt.where(Article.name.ilike(f"%{q}%") | Article.description.ilike(f"%{q}%"))
+    if category_id:
+        stmt = stmt.where(Article.category_id == category_id)
+    return stmt
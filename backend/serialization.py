@@ -0,0 +1,75 @@
+from typing import List, Optional, Tuple
+import orjson
+from fastapi import HTTPException, status
+from models import Article, Category
+from schemas import ArticleResponse, CategoryResponse
+
+# ============================================
+# ZERO-HYDRATION LIST SERIALIZATION
+# ============================================
+#
+# List endpoints select exactly the response columns as Core rows and
+# encode them straight to JSON: no ORM objects in the identity map, no
+# second validation pass through the response models. The columns are
+# derived from the response models, so a field added to a schema is
+# selected automatically.
+
+
+def response_columns(model, schema) -> list:
+    """Table columns backing every field of `schema`, in field order"""
+    return [model.__table__.c[name] for name in schema.model_fields]
+
+
+ARTICLE_COLUMNS = response_columns(Article, ArticleResponse)
+CATEGORY_COLUMNS = response_columns(Category, CategoryResponse)
+
+
+def dump_rows(rows: List[dict]) -> bytes:
+    """JSON for rows read from our own tables, trusted to match their response model"""
+    return orjson.dumps(rows)
+
+
+# ============================================
+# SPARSE FIELDSETS (?fields=id,name,price)
+# ============================================
+
+ARTICLE_FIELDS = tuple(ArticleResponse.model_fields)
+
+# Always selected: the ETag is computed from them. `id` is also always
+# returned, since a client cannot do anything with an article without it.
+ARTICLE_VALIDATOR_FIELDS = ("id", "updated_at")
+
+
+def parse_article_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Validate a `fields=` parameter against ArticleResponse.
+
+    Returns the requested fields plus `id`, in schema order (so equivalent
+    requests share a cache entry), or None for the full representation.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(ARTICLE_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(ARTICLE_FIELDS)}"
+        )
+    requested.add("id")
+    return tuple(name for name in ARTICLE_FIELDS if name in requested)
+
+
+def article_columns(fields: Optional[Tuple[str, ...]]) -> list:
+    """Columns to select for parsed `fields`: the requested ones plus what the ETag needs"""
+    if fields is None:
+        return ARTICLE_COLUMNS
+    selected = set(fields) | set(ARTICLE_VALIDATOR_FIELDS)
+    return [column for column in ARTICLE_COLUMNS if column.key in selected]
+
+
+def project_rows(rows: List[dict], fields: Optional[Tuple[str, ...]]) -> List[dict]:
+    """Drop the columns that were only selected for the ETag"""
+    if fields is None or set(ARTICLE_VALIDATOR_FIELDS) <= set(fields):
+        return rows
+    return [{name: row[name] for name in fields} for row in rows]
@@ -0,0 +1,123 @@
+"""
+Production server for MaBoutique
+Preforks uvicorn workers under gunicorn, with the app preloaded
+
+    python migrations.py
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+
+The app is imported once in the master and forked into each worker, so
+workers start without re-importing it. A worker answers GET /ready with
+503 "starting" until its connection pools are open and its catalog cache
+is warm. On SIGTERM, each worker first reports "draining" at /ready for
+--drain-seconds while still serving, so load balancers stop routing to
+it, then stops accepting connections and gets --graceful-timeout seconds
+to finish the requests in flight.
+
+bcrypt runs in a process pool per worker: unless PASSWORD_WORKERS is
+set, the half of the CPUs it gets on a single process is split between
+the workers.
+
+Each worker keeps its own in-process caches; they follow writes made by
+the other workers through the catalog version in the database (see
+CatalogVersionWatcher in catalog_sync.py). /metrics reports the worker
+that answers the scrape.
+"""
+
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import signal
+import sys
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from uvicorn.server import Server
+from uvicorn.workers import UvicornWorker
+
+
+class DrainingServer(Server):
+    """
+    On the first SIGTERM, keeps serving for `drain_seconds` with /ready
+    reporting "draining", then shuts down as usual. A second signal, or
+    SIGINT, stops at once.
+    """
+
+    drain_seconds = float(os.getenv("DRAIN_SECONDS", "10"))
+    draining = False
+
+    def handle_exit(self, sig, frame):
+        if sig == signal.SIGTERM and not self.draining and not self.should_exit:
+            from main import start_draining
+            self.draining = True
+            start_draining()
+            asyncio.get_running_loop().call_later(self.drain_seconds, super().handle_exit, sig, frame)
+            return
+        super().handle_exit(sig, frame)
+
+
+class DrainingUvicornWorker(UvicornWorker):
+    """UvicornWorker serving through a DrainingServer"""
+
+    async def _serve(self):
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+def post_fork(server, worker):
+    """Never share the master's pooled connections with a worker"""
+    from database import engine, async_engine, async_read_engine
+    for sync_engine in (engine, async_engine.sync_engine, async_read_engine.sync_engine):
+        sync_engine.dispose(close=False)
+
+
+class ProductionServer(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for name, value in self.options.items():
+            self.cfg.set(name, value)
+
+    def load(self):
+        from main import app
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default="127.0.0.1:8000")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--drain-seconds", type=float, default=DrainingServer.drain_seconds,
+                        help="seconds to keep serving, reported as draining, after SIGTERM")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="seconds to finish requests in flight once draining is over")
+    parser.add_argument("--timeout", type=int, default=60, help="seconds before a silent worker is restarted")
+    parser.add_argument("--keepalive", type=int, default=5)
+    args = parser.parse_args()
+
+    # Read at import: by passwords.py when the master preloads the app, and
+    # here when gunicorn imports the worker class as serve.DrainingUvicornWorker
+    os.environ.setdefault("PASSWORD_WORKERS", str(max(1, (os.cpu_count() or 2) // 2 // args.workers)))
+    os.environ["DRAIN_SECONDS"] = str(args.drain_seconds)
+
+    ProductionServer({
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "serve.DrainingUvicornWorker",
+        "preload_app": True,
+        "post_fork": post_fork,
+        # Counted from SIGTERM, so it has to cover the drain period too
+        "graceful_timeout": math.ceil(args.drain_seconds) + args.graceful_timeout,
+        "timeout": args.timeout,
+        "keepalive": args.keepalive,
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
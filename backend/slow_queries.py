@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from logging.handlers import WatchedFileHandler
+from typing import Optional
+from sqlalchemy import event
+from metrics import current_request, metrics
+
+# ============================================
+# SLOW QUERY LOG
+# ============================================
+#
+# Opt-in: set SLOW_QUERY_MS to log every statement slower than that many
+# milliseconds, as one JSON object per line, with its route, redacted
+# parameters, row count and the EXPLAIN QUERY PLAN taken on the same
+# connection right after it ran. A token bucket caps the entries written
+# (and plans run) per minute; slow statements over the cap are counted and
+# reported with the next entry instead.
+#
+# Every gunicorn worker appends to the same file, one line per write, so
+# entries never interleave; none of them rotates it. Rotate it externally
+# (logrotate, without copytruncate): each worker reopens the file when it
+# sees it was moved.
+
+SLOW_QUERY_MS = os.getenv("SLOW_QUERY_MS")
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+SLOW_QUERY_MAX_PER_MINUTE = float(os.getenv("SLOW_QUERY_MAX_PER_MINUTE", "30"))
+
+# Statements with no plan worth capturing
+NO_PLAN_PREFIXES = ("PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "CREATE", "DROP", "ALTER")
+
+
+def redact(value):
+    """Keep numbers, booleans and NULLs; hide text, which may be a password, token or email"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+class TokenBucket:
+    """Up to `rate` events per minute, in bursts of at most `rate`"""
+
+    def __init__(self, rate: float):
+        self.capacity = rate
+        self.per_second = rate / 60
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_second)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class SlowQueryLog:
+    def __init__(self, path: str, threshold_ms: float, max_per_minute: float):
+        self.threshold = threshold_ms / 1000
+        self.bucket = TokenBucket(max_per_minute)
+        self.logged = 0
+        self.suppressed = 0
+        self._suppressed_since_entry = 0
+
+        self.logger = logging.getLogger("maboutique.slow_queries")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        handler = WatchedFileHandler(path)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(handler)
+
+    def install(self, engine, name: str):
+        """Watch statements on `engine` (sync or async)"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._slow_query_started = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context._slow_query_started
+            if elapsed >= self.threshold:
+                self.record(name, conn, cursor, statement, parameters, executemany, elapsed)
+
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def record(self, name: str, conn, cursor, statement: str, parameters, executemany: bool, elapsed: float):
+        if not self.bucket.take():
+            self.suppressed += 1
+            self._suppressed_since_entry += 1
+            return
+
+        request = current_request.get()
+        entry = {
+            "time": datetime.utcnow().isoformat(),
+            "engine": name,
+            "method": request.scope["method"] if request is not None else None,
+            "route": request.route if request is not None else None,
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": statement,
+            "parameters": redact(parameters),
+            "executemany": executemany,
+            "rows": self._row_count(cursor),
+            "plan": self._query_plan(conn, statement, parameters[0] if executemany else parameters),
+            "suppressed_since_last": self._suppressed_since_entry,
+        }
+        self._suppressed_since_entry = 0
+        self.logged += 1
+        self.logger.info(json.dumps(entry, default=str))
+
+    @staticmethod
+    def _row_count(cursor) -> Optional[int]:
+        # The aiosqlite adapter buffers a SELECT's rows before returning from
+        # execute(), so they can be counted without consuming them; for
+        # writes, rowcount is the number of rows affected
+        rows = getattr(cursor, "_rows", None)
+        if cursor.description is not None and rows is not None:
+            return len(rows)
+        return cursor.rowcount if cursor.rowcount >= 0 else None
+
+    @staticmethod
+    def _query_plan(conn, statement: str, parameters) -> Optional[list]:
+        if conn.dialect.name != "sqlite" or statement.lstrip().upper().startswith(NO_PLAN_PREFIXES):
+            return None
+        # A raw DB-API cursor on the same connection (and transaction): the
+        # plan is the one SQLite would use right now, and no engine events
+        # fire for it
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        except Exception as e:
+            return [f"unavailable: {e}"]
+        finally:
+            cursor.close()
+
+    def stats(self) -> dict:
+        return {"logged": self.logged, "suppressed": self.suppressed}
+
+
+slow_query_log: Optional[SlowQueryLog] = None
+if SLOW_QUERY_MS:
+    slow_query_log = SlowQueryLog(SLOW_QUERY_LOG, float(SLOW_QUERY_MS), SLOW_QUERY_MAX_PER_MINUTE)
+    metrics.register_collector(lambda: [(
+        "maboutique_slow_queries_total", "counter", "Statements over SLOW_QUERY_MS, by whether they were logged",
+        [({"outcome": outcome}, count) for outcome, count in slow_query_log.stats().items()],
+    )])
+
+
+def install_slow_query_log(engine, name: str):
+    """Watch `engine` when the slow query log is enabled; a no-op otherwise"""
+    if slow_query_log is not None:
+        slow_query_log.install(engine, name)
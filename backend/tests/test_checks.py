@@ -0,0 +1,28 @@
+"""
+Every benchmarks/check_* script, run under pytest.
+
+Each check runs in a process of its own: database.py binds
+./maboutique.db at import, and every check wants a new database.
+
+    cd backend && python -m pytest tests
+"""
+
+import glob
+import os
+import subprocess
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHECKS = sorted(
+    os.path.splitext(os.path.basename(path))[0]
+    for path in glob.glob(os.path.join(BACKEND_DIR, "benchmarks", "check_*.py"))
+)
+
+
+@pytest.mark.parametrize("check", CHECKS)
+def test_check(check):
+    result = subprocess.run(
+        [sys.executable, "-m", f"benchmarks.{check}"], cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
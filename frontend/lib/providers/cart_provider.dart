@@ -16,8 +16,7 @@ class CartProvider extends ChangeNotifier {
     }
 
     try {
-      final cart = await CartService.getCart();
-      _cartItemCount = cart.totalItems;
+      _cartItemCount = await CartService.getCartItemCount();
       notifyListeners();
     } catch (e) {
       print('Error loading cart count: $e');
@@ -5,6 +5,31 @@ import '../models/category.dart';
 import 'api_service.dart';
 
 class ArticleService {
+  // Last ETag and 200 response seen per URL; a 304 reply reuses the stored one
+  static final Map<String, String> _etags = {};
+  static final Map<String, http.Response> _responses = {};
+
+  // GET with If-None-Match so unchanged catalog data costs no download
+  static Future<http.Response> _conditionalGet(String url) async {
+    final headers = ApiService.getHeaders();
+    final etag = _etags[url];
+    if (etag != null) {
+      headers['If-None-Match'] = etag;
+    }
+
+    final response = await http.get(Uri.parse(url), headers: headers);
+
+    if (response.statusCode == 304 && _responses.containsKey(url)) {
+      return _responses[url]!;
+    }
+    final newEtag = response.headers['etag'];
+    if (response.statusCode == 200 && newEtag != null) {
+      _etags[url] = newEtag;
+      _responses[url] = response;
+    }
+    return response;
+  }
+
   // Fetch all articles
   static Future<List<Article>> getArticles({int? categoryId}) async {
     try {
@@ -13,10 +38,7 @@ class ArticleService {
         url += '?category_id=$categoryId';
       }
 
-      final response = await http.get(
-        Uri.parse(url),
-        headers: ApiService.getHeaders(),
-      );
+      final response = await _conditionalGet(url);
 
       print('📤 Get articles response status: ${response.statusCode}');
       print('📤 Get articles response body: ${response.body}');
@@ -37,10 +59,7 @@ class ArticleService {
   // Fetch single article by ID
   static Future<Article> getArticleById(int id) async {
     try {
-      final response = await http.get(
-        Uri.parse('${ApiService.baseUrl}/articles/$id'),
-        headers: ApiService.getHeaders(),
-      );
+      final response = await _conditionalGet('${ApiService.baseUrl}/articles/$id');
 
       print('📤 Get article by ID response status: ${response.statusCode}');
 
@@ -60,10 +79,7 @@ class ArticleService {
   // Fetch featured articles
   static Future<List<Article>> getFeaturedArticles() async {
     try {
-      final response = await http.get(
-        Uri.parse('${ApiService.baseUrl}/articles/featured'),
-        headers: ApiService.getHeaders(),
-      );
+      final response = await _conditionalGet('${ApiService.baseUrl}/articles/featured');
 
       print('📤 Get featured articles response status: ${response.statusCode}');
 
@@ -88,10 +104,7 @@ class ArticleService {
         url += '&category_id=$categoryId';
       }
 
-      final response = await http.get(
-        Uri.parse(url),
-        headers: ApiService.getHeaders(),
-      );
+      final response = await _conditionalGet(url);
 
       print('📤 Search articles response status: ${response.statusCode}');
 
@@ -111,10 +124,7 @@ class ArticleService {
   // Fetch all categories
   static Future<List<Category>> getCategories() async {
     try {
-      final response = await http.get(
-        Uri.parse('${ApiService.baseUrl}/categories'),
-        headers: ApiService.getHeaders(),
-      );
+      final response = await _conditionalGet('${ApiService.baseUrl}/categories');
 
       print('📤 Get categories response status: ${response.statusCode}');
 
@@ -134,10 +144,7 @@ class ArticleService {
   // Fetch articles on sale (with discounts)
   static Future<List<Article>> getArticlesOnSale() async {
     try {
-      final response = await http.get(
-        Uri.parse('${ApiService.baseUrl}/articles/on-sale'),
-        headers: ApiService.getHeaders(),
-      );
+      final response = await _conditionalGet('${ApiService.baseUrl}/articles/on-sale');
 
       print('📤 Get sale articles response status: ${response.statusCode}');
 
@@ -33,6 +33,34 @@ class CartService {
     }
   }
 
+  // Get only the number of items in the cart (no item list)
+  static Future<int> getCartItemCount() async {
+    try {
+      final token = AuthService.currentToken;
+      if (token == null) {
+        throw Exception('User not authenticated');
+      }
+
+      final response = await http.get(
+        Uri.parse('${ApiService.baseUrl}/cart/summary'),
+        headers: ApiService.getHeaders(token: token),
+      );
+
+      print('📤 Get cart summary response status: ${response.statusCode}');
+
+      if (response.statusCode == 200) {
+        final data = jsonDecode(response.body);
+        return data['total_items'];
+      } else {
+        final error = jsonDecode(response.body);
+        throw Exception(error['detail'] ?? 'Failed to fetch cart summary');
+      }
+    } catch (e) {
+      print('❌ Get cart summary error: $e');
+      throw Exception('Network error: ${e.toString()}');
+    }
+  }
+
   // Add item to cart
   static Future<CartItem> addToCart({
     required int articleId,